@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+APP_CACHE_NAME = "thermalright-lcd-control"
+
+
+def get_cache_dir(name: str) -> Path:
+    """
+    Get a cache directory shared by the service and the GUI, creating it if needed
+
+    The directory lives under $XDG_CACHE_HOME, or ~/.cache when it is not set.
+
+    Args:
+        name: Sub-directory for one kind of cached data
+    """
+    base_dir = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    cache_dir = Path(base_dir) / APP_CACHE_NAME / name
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def touch(path: Path):
+    """
+    Mark a cache file as recently used for evict_lru, best-effort
+
+    Only the owner of a file may set its times to the current time, so a
+    file written by the service running as root cannot be touched by the GUI
+    and is evicted by its age instead.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def evict_lru(cache_dir: Path, suffix: str, max_bytes: int, keep: Optional[Path] = None,
+              temp_max_age: float = 3600) -> List[Path]:
+    """
+    Delete the least recently modified cache files until they fit in max_bytes
+
+    Cache users touch a file when they read it, so its modification time is
+    its last use. Temporary files left by a process that died while writing
+    are removed once they are older than temp_max_age.
+
+    Args:
+        cache_dir: Directory holding the cache files
+        suffix: Suffix of the cache files, other files are ignored
+        max_bytes: Maximum total size of the cache files
+        keep: File that must not be evicted, usually the one just written
+
+    Returns:
+        List[Path]: Evicted files
+    """
+    entries = []
+    now = time.time()
+    for path in cache_dir.iterdir():
+        try:
+            stat = path.stat()
+            if path.suffix == '.tmp':
+                if now - stat.st_mtime > temp_max_age:
+                    path.unlink()
+            elif path.suffix == suffix:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            continue
+
+    evicted = []
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+            total_size -= size
+            evicted.append(path)
+        except OSError:
+            pass
+    return evicted
@@ -1,18 +1,32 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright © 2025 Rejeb Ben Rejeb
 
-from .display.display_device import load_device
+from typing import Optional
+
+from .display.display_device import load_devices
+from .runtime import run_devices
 from ..common.logging_config import get_service_logger
 
 
-def run_service(config_file: str):
+def run_service(config_file: str, keep_alive: Optional[float] = None):
+    """
+    Drive every connected display
+
+    Args:
+        config_file: Display configuration file
+        keep_alive: Seconds after which an unchanged frame is resent, 0 to send every frame,
+            None to keep the default of each device
+    """
     logger = get_service_logger()
     logger.info("Device controller service started")
 
     try:
-        device = load_device(config_file)
-        device.reset()
-        device.run()
+        devices = load_devices(config_file)
+        for device in devices:
+            if keep_alive is not None:
+                device.keep_alive_interval = keep_alive if keep_alive > 0 else None
+            logger.info(f"Display {device.name} ({device.__class__.__name__}) using {device.config_file}")
+        run_devices(devices)
     except KeyboardInterrupt:
         logger.info("Device controller service stopped by user")
     except Exception as e:
@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import hashlib
+import logging
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from .frame_cache import compact_frame
+from ...common.cache_dir import evict_lru, get_cache_dir, touch
+
+
+class AssetCache:
+    """
+    On-disk cache of background and foreground images at display size
+
+    Scaled images are stored as raw pixels keyed by source path, modification
+    time, size, target geometry and resampling filter. The service and the
+    GUI read the same directory, so theme switches, configuration reloads
+    and restarts skip decoding and resizing the source files. The cache is
+    bounded by max_bytes, evicting the least recently used files first.
+    """
+
+    MAGIC = b'TLAC'
+    VERSION = 1
+    # magic, version, mode, width, height
+    HEADER = struct.Struct('<4sH4sHH')
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = logging.getLogger('thermalright.display.asset_cache')
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir('assets')
+        self.max_bytes = max_bytes
+
+    def _cache_file(self, image_path: str, size: Optional[Tuple[int, int]],
+                    resample: Image.Resampling) -> Path:
+        stat = os.stat(image_path)
+        geometry = f"{size[0]}x{size[1]}" if size else "original"
+        key = (f"{os.path.realpath(image_path)}\0{stat.st_mtime_ns}\0{stat.st_size}\0"
+               f"{geometry}\0{Image.Resampling(resample).name}")
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pixels"
+
+    def _read(self, cache_file: Path) -> Optional[Image.Image]:
+        try:
+            with open(cache_file, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+
+        magic, version, mode, width, height = self.HEADER.unpack_from(data, 0)
+        mode = mode.rstrip(b'\0').decode('ascii')
+        if magic != self.MAGIC or version != self.VERSION or mode not in ('RGB', 'RGBA'):
+            raise ValueError(f"Invalid asset cache file: {cache_file}")
+        image = Image.frombytes(mode, (width, height), data[self.HEADER.size:])
+        # Mark as recently used for eviction
+        touch(cache_file)
+        return image
+
+    def _write(self, cache_file: Path, image: Image.Image):
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, image.mode.encode('ascii'), image.width, image.height)
+        temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_file, 'wb') as file:
+                file.write(header)
+                file.write(image.tobytes())
+            os.replace(temp_file, cache_file)
+        finally:
+            temp_file.unlink(missing_ok=True)
+        for path in evict_lru(self.cache_dir, '.pixels', self.max_bytes, keep=cache_file):
+            self.logger.debug(f"Evicted asset cache file {path}")
+
+    def load(self, image_path: str, size: Optional[Tuple[int, int]] = None,
+             resample: Image.Resampling = Image.Resampling.LANCZOS) -> Image.Image:
+        """
+        Load an image as RGBA, scaled to size, from the cache when possible
+
+        Args:
+            image_path: Source image file
+            size: Target (width, height), None to keep the original size
+            resample: Resampling filter used to scale the image
+        """
+        cache_file = self._cache_file(image_path, size, resample)
+        try:
+            image = self._read(cache_file)
+            if image is not None:
+                return image.convert('RGBA') if image.mode != 'RGBA' else image
+        except (ValueError, struct.error) as e:
+            self.logger.warning(f"Discarding asset cache file {cache_file}: {e}")
+            cache_file.unlink(missing_ok=True)
+        except OSError as e:
+            # Not a broken file, such as one this user cannot read: keep it for the others
+            self.logger.debug(f"Cannot read asset cache file {cache_file}: {e}")
+
+        image = Image.open(image_path)
+        if size:
+            image = image.resize(size, resample)
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+
+        try:
+            # Opaque images are stored without their alpha channel
+            self._write(cache_file, compact_frame(image))
+        except OSError as e:
+            self.logger.debug(f"Cannot store asset cache file {cache_file}: {e}")
+        return image
+
+
+_asset_cache: Optional[AssetCache] = None
+_asset_cache_disabled = False
+_asset_cache_lock = threading.Lock()
+
+
+def get_asset_cache() -> Optional[AssetCache]:
+    """Get the asset cache of this process, None if its directory cannot be used"""
+    global _asset_cache, _asset_cache_disabled
+    with _asset_cache_lock:
+        if _asset_cache is None and not _asset_cache_disabled:
+            try:
+                _asset_cache = AssetCache()
+            except OSError as e:
+                logging.getLogger('thermalright.display.asset_cache').warning(f"Asset cache disabled: {e}")
+                _asset_cache_disabled = True
+        return _asset_cache
+
+
+def load_scaled_image(image_path: str, size: Optional[Tuple[int, int]] = None,
+                      resample: Image.Resampling = Image.Resampling.LANCZOS) -> Image.Image:
+    """Load an image as RGBA scaled to size, through the asset cache when it is usable"""
+    asset_cache = get_asset_cache()
+    if asset_cache:
+        return asset_cache.load(image_path, size, resample)
+
+    image = Image.open(image_path)
+    if size:
+        image = image.resize(size, resample)
+    return image.convert('RGBA') if image.mode != 'RGBA' else image
@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import itertools
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from PIL import Image, ImageDraw
+
+from .encoder import FRAME_SERIAL_KEY, dirty_frame_info
+from .frame_manager import FrameManager
+from .text_renderer import TextItem, TextRenderer
+
+Box = Tuple[int, int, int, int]
+
+# Frame serials are unique in the process, so encoders never mistake frames of different compositors
+_frame_serials = itertools.count(1)
+
+
+def _intersects(a: Box, b: Box) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class LayerCompositor:
+    """
+    Frame composed from cached layers, each recomputed only when its inputs change
+
+    The base layer holds the background frame with the foreground on top and
+    is keyed by the background frame, so a static background or a GIF frame
+    shown for several renders is composed once. The text layer draws the
+    metrics, date and time over the base layer. When only some texts changed,
+    just their boxes, and the boxes of texts overlapping them, are restored
+    from the base layer and redrawn; the frame then carries these dirty boxes
+    in its Image.info so the encoder only re-encodes them. Without any change
+    the previous frame is returned as is. The number of recomputations of
+    each layer is kept for profiling.
+    """
+
+    # Margin around text boxes, covering antialiasing
+    BOX_MARGIN = 2
+    # Above this share of the frame, redrawing everything is cheaper
+    MAX_DIRTY_RATIO = 0.5
+
+    def __init__(self, frame_manager: FrameManager, text_renderer: TextRenderer,
+                 foreground: Optional[Image.Image] = None, foreground_position: Tuple[int, int] = (0, 0)):
+        self.frame_manager = frame_manager
+        self.text_renderer = text_renderer
+        self.foreground = foreground
+        self.foreground_position = foreground_position
+
+        self._base_key: Optional[Hashable] = None
+        self._base: Optional[Image.Image] = None
+        # Base layer with every text drawn, kept in RGBA to draw texts exactly as on a full redraw
+        self._canvas: Optional[Image.Image] = None
+        self._text_items: List[TextItem] = []
+        self._text_boxes: List[Box] = []
+        self._frame: Optional[Image.Image] = None
+
+        self.frames = 0
+        self.recompute_counts = {'background': 0, 'foreground': 0, 'text': 0, 'text_partial': 0}
+
+    def _update_base(self) -> bool:
+        """Recompose the base layer if the background moved to another frame"""
+        key = self.frame_manager.advance_frame()
+        if self._base is not None and key == self._base_key:
+            return False
+
+        background = self.frame_manager.get_frame()
+        self.recompute_counts['background'] += 1
+        if self.foreground is not None:
+            background = background.copy()
+            background.paste(self.foreground, self.foreground_position, self.foreground)
+            self.recompute_counts['foreground'] += 1
+        self._base_key = key
+        self._base = background
+        return True
+
+    def _item_box(self, draw: ImageDraw.Draw, item: TextItem) -> Box:
+        left, top, right, bottom = self.text_renderer.get_item_bbox(draw, item)
+        margin = self.BOX_MARGIN
+        return (max(int(left) - margin, 0), max(int(top) - margin, 0),
+                min(int(right) + margin, self._base.width), min(int(bottom) + margin, self._base.height))
+
+    def _draw_all(self, text_items: List[TextItem]) -> Image.Image:
+        canvas = self._base.copy()
+        draw = ImageDraw.Draw(canvas)
+        for item in text_items:
+            self.text_renderer.draw_item(draw, item)
+        self._canvas = canvas
+        self._text_boxes = [self._item_box(draw, item) for item in text_items]
+        self.recompute_counts['text'] += 1
+
+        frame = canvas.convert('RGB')
+        frame.info.update(dirty_frame_info(next(_frame_serials)))
+        return frame
+
+    def _draw_dirty(self, text_items: List[TextItem]) -> Optional[Image.Image]:
+        """Redraw only the texts that changed, None if a full redraw is needed"""
+        draw = ImageDraw.Draw(self._canvas)
+        boxes = [self._item_box(draw, item) for item in text_items]
+
+        dirty: List[Box] = []
+        redraw: Set[int] = set()
+        for index, (item, previous) in enumerate(zip(text_items, self._text_items)):
+            if item != previous:
+                dirty += [self._text_boxes[index], boxes[index]]
+                redraw.add(index)
+
+        # Texts overlapping a dirty box are redrawn as a whole, which may in turn extend the dirty area
+        extended = True
+        while extended:
+            extended = False
+            for index, box in enumerate(boxes):
+                if index not in redraw and any(_intersects(box, rect) for rect in dirty):
+                    dirty.append(box)
+                    redraw.add(index)
+                    extended = True
+
+        dirty = [rect for rect in dirty if rect[0] < rect[2] and rect[1] < rect[3]]
+        dirty_area = sum((rect[2] - rect[0]) * (rect[3] - rect[1]) for rect in dirty)
+        if dirty_area > self.MAX_DIRTY_RATIO * self._base.width * self._base.height:
+            return None
+
+        for rect in dirty:
+            self._canvas.paste(self._base.crop(rect), rect[:2])
+        for index in sorted(redraw):
+            self.text_renderer.draw_item(draw, text_items[index])
+        self._text_boxes = boxes
+        self.recompute_counts['text_partial'] += 1
+
+        # Frames may still be in use by the encoder, the update goes to a new one
+        frame = self._frame.copy()
+        for rect in dirty:
+            frame.paste(self._canvas.crop(rect).convert('RGB'), rect[:2])
+        frame.info.update(dirty_frame_info(next(_frame_serials), self._frame.info.get(FRAME_SERIAL_KEY), dirty))
+        return frame
+
+    def compose(self, text_items: List[TextItem]) -> Image.Image:
+        """
+        Get the frame showing the current background and the given texts
+
+        The returned image may be returned again by later calls and must not be modified.
+        """
+        self.frames += 1
+        base_changed = self._update_base()
+        frame = None
+        if not base_changed and self._frame is not None:
+            if text_items == self._text_items:
+                return self._frame
+            if len(text_items) == len(self._text_items):
+                frame = self._draw_dirty(text_items)
+        if frame is None:
+            frame = self._draw_all(text_items)
+
+        self._frame = frame
+        self._text_items = text_items
+        return frame
+
+    def invalidate(self):
+        """Force every layer to be recomputed for the next frame"""
+        self._base = None
+        self._frame = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of frames composed and of recomputations per layer"""
+        return {
+            'frames': self.frames,
+            'recompute_counts': dict(self.recompute_counts)
+        }
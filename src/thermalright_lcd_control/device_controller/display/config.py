@@ -46,6 +46,9 @@ class DisplayConfig:
     background_path: str
     background_type: BackgroundType
 
+    # Number of video frames decoded ahead of playback
+    video_buffer_depth: int = 8
+
     # Output dimensions
     output_width: int = 320
     output_height: int = 240
@@ -122,6 +122,7 @@ class ConfigLoader:
         config = DisplayConfig(
             background_path=display_data["background"]["path"],
             background_type=BackgroundType(display_data["background"]["type"]),
+            video_buffer_depth=display_data["background"].get("buffer_depth", 8),
             foreground_image_path=foreground_path,
             foreground_position=foreground_position,
             foreground_alpha=foreground_alpha,
@@ -1,120 +1,188 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright © 2025 Rejeb Ben Rejeb
+import ctypes
+import os
 import pathlib
+import re
 import struct
-import time
 from abc import abstractmethod, ABC
-from typing import Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 import hid
 import usb.core
 import usb.util
 from PIL import Image
 
-from .config_loader import ConfigLoader
-from .generator import DisplayGenerator
+from .encoder import FrameEncoder
+from .packetizer import FramePacketizer
+from .pipeline import FramePipeline, FrameSlot
+from .render_cache import get_render_cache
+from ..runtime import run_devices
 from ...common.logging_config import LoggerConfig
 
+# USB port path of an interface, such as 1-2.4:1.0 (bus 1, ports 2 then 4, configuration 1, interface 0)
+_INTERFACE_PATTERN = re.compile(r'(\d+-[\d.]+):\d+\.\d+$')
+# hidapi libusb paths of older versions, bus:address:interface in hex
+_BUS_ADDRESS_PATTERN = re.compile(r'([0-9a-fA-F]{4}):([0-9a-fA-F]{4}):[0-9a-fA-F]{2}$')
+
+
+def usb_location(path: Optional[bytes], sysfs_root: str = '/sys') -> Optional[Union[str, Tuple[int, int]]]:
+    """
+    Locate the USB device behind a hidapi path
+
+    Returns its port path such as '1-2.4' for hidraw and libusb paths, a
+    (bus, address) pair for older libusb paths, None if it cannot be told.
+    """
+    if not path:
+        return None
+    path = path.decode(errors='replace') if isinstance(path, bytes) else path
+    if path.startswith('/dev/hidraw'):
+        device_dir = os.path.realpath(os.path.join(sysfs_root, 'class', 'hidraw', os.path.basename(path), 'device'))
+        for part in reversed(device_dir.split(os.sep)):
+            match = _INTERFACE_PATTERN.match(part)
+            if match:
+                return match.group(1)
+        return None
+    match = _INTERFACE_PATTERN.match(path)
+    if match:
+        return match.group(1)
+    match = _BUS_ADDRESS_PATTERN.match(path)
+    if match:
+        return int(match.group(1), 16), int(match.group(2), 16)
+    return None
+
+
+def _matches_location(dev: usb.core.Device, location: Union[str, Tuple[int, int]]) -> bool:
+    if isinstance(location, tuple):
+        return (dev.bus, dev.address) == location
+    if not dev.port_numbers:
+        return False
+    return f"{dev.bus}-{'.'.join(str(port) for port in dev.port_numbers)}" == location
+
+
+def _serial_number(dev: usb.core.Device) -> Optional[str]:
+    try:
+        return dev.serial_number
+    except (ValueError, usb.core.USBError):
+        # No serial string descriptor, or no permission to read it
+        return None
+
+
+def find_usb_device(vid: int, pid: int, path: Optional[bytes] = None,
+                    serial_number: Optional[str] = None) -> Optional[usb.core.Device]:
+    """
+    Find the pyusb device of one HID panel
+
+    Identical panels share their VID:PID, so the device is matched by the USB
+    location of its hidapi path, then by serial number. None when several
+    devices remain and none of them can be told apart.
+    """
+    candidates = list(usb.core.find(find_all=True, idVendor=vid, idProduct=pid))
+    if len(candidates) <= 1:
+        return candidates[0] if candidates else None
+
+    location = usb_location(path)
+    if location is not None:
+        matches = [dev for dev in candidates if _matches_location(dev, location)]
+        if len(matches) == 1:
+            return matches[0]
+    if serial_number:
+        matches = [dev for dev in candidates if _serial_number(dev) == serial_number]
+        if len(matches) == 1:
+            return matches[0]
+    return None
+
 
 class DisplayDevice(hid.Device, ABC):
-    _generator: DisplayGenerator = None
+    # Frames that did not change are only resent after this many seconds, None sends every frame
+    keep_alive_interval: Optional[float] = 5.0
 
-    def __init__(self, vid, pid, chunk_size, width, height, config_file: str, *args, **kwargs):
-        super().__init__(vid, pid)
+    def __init__(self, vid, pid, chunk_size, width, height, config_file: str, path: Optional[bytes] = None,
+                 usb_device: Optional[usb.core.Device] = None, *args, **kwargs):
+        super().__init__(vid, pid, path=path)
         self.vid = vid
         self.pid = pid
+        self.path = path
+        # pyusb device of this panel used by reset(), looked up from the path when not given
+        self.usb_device = usb_device
+        self.name = f"{vid:04x}:{pid:04x}"
         self.chunk_size = chunk_size
         self.height = height
         self.width = width
+        self.encoder = FrameEncoder(width, height)
         self.header = self.get_header()
         self.config_file = config_file
-        self.last_modified = pathlib.Path(config_file).stat().st_mtime_ns
         self.logger = LoggerConfig.setup_service_logger()
-        self._build_generator()
+        self.render_cache = get_render_cache(config_file, width, height)
+        self.pipeline: Optional[FramePipeline] = None
         self.logger.debug(f"DisplayDevice initialized with header: {self.header}")
 
-    def _build_generator(self) -> DisplayGenerator:
-        config_loader = ConfigLoader()
-        config = config_loader.load_config(self.config_file)
-        config.output_width = self.width
-        config.output_height = self.height
-        return DisplayGenerator(config)
-
-    def _get_generator(self) -> DisplayGenerator:
-        if self._generator is None:
-            self.logger.info(f"No generator found, reloading from {self.config_file}")
-            self._generator = self._build_generator()
-            return self._generator
-        elif pathlib.Path(self.config_file).stat().st_mtime_ns > self.last_modified:
-            self.logger.info(f"Config file updated: {self.config_file}")
-            self.last_modified = pathlib.Path(self.config_file).stat().st_mtime_ns
-            self._generator = self._build_generator()
-            self.logger.info(f"Display device generator reloaded from {self.config_file}")
-            return self._generator
-        else:
-            return self._generator
-
-    def _encode_image(self, img: Image) -> bytearray:
-        width, height = img.size
-        coords = [(x, y) for x in range(width) for y in range(height - 1, -1, -1)]
-        out = bytearray()
-        for i, (x, y) in enumerate(coords, start=1):
-            if i % height == 0:
-                out.extend((0x00, 0x00))
-            else:
-                r, g, b = img.getpixel((x, y))
-                val565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-                lo = val565 & 0xFF
-                hi = (val565 >> 8) & 0xFF
-                out.extend((lo, hi))
-        return out
-
     @abstractmethod
     def get_header(self, *args, **kwargs):
         pass
 
     def reset(self):
-        dev = usb.core.find(idVendor=self.vid, idProduct=self.pid)
-        if dev is None:
+        if self.usb_device is None:
+            self.usb_device = find_usb_device(self.vid, self.pid, self.path)
+        if self.usb_device is None:
             raise ValueError("Display device not found")
-        dev.reset()
+        self.usb_device.reset()
         self.logger.info("Display device reinitialised via USB reset")
 
-    def _prepare_frame_packets(self, img_bytes: bytes):
-        frame_packets = []
-        for i in range(0, len(img_bytes), self.chunk_size):
-            chunk = img_bytes[i:i + self.chunk_size]
-            if len(chunk) < self.chunk_size:
-                chunk += b"\x00" * (self.chunk_size - len(chunk))
-            frame_packets.append(bytes([0x00]) + chunk)
-        return frame_packets
+    def _new_frame_slot(self) -> FrameSlot:
+        packetizer = FramePacketizer(len(self.header), self.width * self.height * 2, self.chunk_size)
+        # hidapi's ctypes binding takes c_char_p, which accepts c_char arrays but not memoryviews,
+        # so wrap each packet slice once without copying it
+        report_packets = [(ctypes.c_char * len(packet)).from_buffer(packet) for packet in packetizer.packets]
+        return FrameSlot(packetizer, report_packets)
+
+    def _render_frame(self) -> Tuple[Image, float]:
+        return self.render_cache.get_frame_with_duration()
+
+    def _encode_frame(self, img: Image, slot: FrameSlot):
+        slot.packetizer.write_header(self.get_header())
+        self.encoder.encode_into(img, slot.packetizer)
+
+    def _transmit_frame(self, slot: FrameSlot):
+        for packet in slot.transfers:
+            self.write(packet)
+
+    def create_pipeline(self) -> FramePipeline:
+        """Create the render / encode / transmit pipeline driving this panel"""
+        self.pipeline = FramePipeline(self._render_frame, self._encode_frame, self._transmit_frame,
+                                      self._new_frame_slot, keep_alive=self.keep_alive_interval,
+                                      name=self.name)
+        return self.pipeline
 
     def run(self):
         self.logger.info("Display device running")
-        while True:
-            img, delay_time = self._get_generator().get_frame_with_duration()
-            header = self.get_header()
-            img_bytes = header + self._encode_image(img)
-            frame_packets = self._prepare_frame_packets(img_bytes)
-            for packet in frame_packets:
-                self.write(packet)
-            time.sleep(delay_time)
+        run_devices([self])
 
 
 class USBDisplayDevice(ABC):
-    def __init__(self, vid, pid, chunk_size, width, height, config_file: str, endpoint_out, endpoint_in, interface=0):
+    # Bulk endpoints need no HID report ID byte: stream header + payload in as few write() calls as
+    # possible and let libusb split them into packets. Set to False to send one report per chunk.
+    bulk_transfer = True
+    # Maximum bytes per write() call in bulk mode, None sends the whole frame at once
+    bulk_transfer_size: Optional[int] = None
+    # Frames that did not change are only resent after this many seconds, None sends every frame
+    keep_alive_interval: Optional[float] = 5.0
+
+    def __init__(self, vid, pid, chunk_size, width, height, config_file: str, endpoint_out, endpoint_in, interface=0,
+                 dev: Optional[usb.core.Device] = None):
         self.vid = vid
         self.pid = pid
+        self.name = f"{vid:04x}:{pid:04x}"
         self.chunk_size = chunk_size
         self.height = height
         self.width = width
+        self.encoder = FrameEncoder(width, height)
         self.endpoint_out = endpoint_out
         self.endpoint_in = endpoint_in
         self.interface = interface
         self.config_file = config_file
-        self.last_modified = pathlib.Path(config_file).stat().st_mtime_ns
         self.logger = LoggerConfig.setup_service_logger()
-        self.dev = usb.core.find(idVendor=self.vid, idProduct=self.pid)
+        self.dev = dev if dev is not None else usb.core.find(idVendor=self.vid, idProduct=self.pid)
         if self.dev is None:
             raise ValueError("USB device not found")
 
@@ -122,81 +190,83 @@ class USBDisplayDevice(ABC):
             self.dev.detach_kernel_driver(self.interface)
         usb.util.claim_interface(self.dev, self.interface)
         self.logger.info(f"USB device {hex(self.vid)}:{hex(self.pid)} claimed on interface {self.interface}")
+        self.logger.info(f"USB frame sent in {self.writes_per_frame()} write(s) "
+                         f"({'bulk' if self.bulk_transfer else 'report'} mode)")
 
-        self._generator = self._build_generator()
-
-    def _build_generator(self) -> DisplayGenerator:
-        config_loader = ConfigLoader()
-        config = config_loader.load_config(self.config_file)
-        config.output_width = self.width
-        config.output_height = self.height
-        return DisplayGenerator(config)
-
-    def _get_generator(self) -> DisplayGenerator:
-        if self._generator is None:
-            self._generator = self._build_generator()
-        elif pathlib.Path(self.config_file).stat().st_mtime_ns > self.last_modified:
-            self.last_modified = pathlib.Path(self.config_file).stat().st_mtime_ns
-            self._generator = self._build_generator()
-        return self._generator
-
-    def _encode_image(self, img: Image) -> bytearray:
-        width, height = img.size
-        coords = [(x, y) for x in range(width) for y in range(height - 1, -1, -1)]
-        out = bytearray()
-        for i, (x, y) in enumerate(coords, start=1):
-            if i % height == 0:
-                out.extend((0x00, 0x00))
-            else:
-                r, g, b = img.getpixel((x, y))
-                val565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-                lo = val565 & 0xFF
-                hi = (val565 >> 8) & 0xFF
-                out.extend((lo, hi))
-        return out
+        self.render_cache = get_render_cache(config_file, width, height)
+        self.pipeline: Optional[FramePipeline] = None
 
     def get_header(self) -> bytes:
         return struct.pack('<BBHHH', 0x69, 0x88, self.width, self.height, 0)
 
-    def _prepare_frame_packets(self, img_bytes: bytes):
-        frame_packets = []
-        for i in range(0, len(img_bytes), self.chunk_size):
-            chunk = img_bytes[i:i + self.chunk_size]
-            if len(chunk) < self.chunk_size:
-                chunk += b"\x00" * (self.chunk_size - len(chunk))
-            frame_packets.append(bytes([0x00]) + chunk)
-        return frame_packets
+    def reset(self):
+        self.dev.reset()
+        self.logger.info("USB display device reinitialised via USB reset")
+
+    def writes_per_frame(self) -> int:
+        """Number of write() calls sending one frame, computed like the transfers of _new_frame_slot"""
+        packet_count = -(-(len(self.get_header()) + self.width * self.height * 2) // self.chunk_size)
+        if not self.bulk_transfer:
+            return packet_count
+        frame_size = packet_count * self.chunk_size
+        if self.bulk_transfer_size is None or self.bulk_transfer_size >= frame_size:
+            return 1
+        step = max(self.bulk_transfer_size // self.chunk_size, 1) * self.chunk_size
+        return -(-frame_size // step)
+
+    def _new_frame_slot(self) -> FrameSlot:
+        header_size = len(self.get_header())
+        if self.bulk_transfer:
+            packetizer = FramePacketizer(header_size, self.width * self.height * 2, self.chunk_size, report_id=None)
+            return FrameSlot(packetizer, packetizer.transfers(self.bulk_transfer_size))
+        packetizer = FramePacketizer(header_size, self.width * self.height * 2, self.chunk_size)
+        return FrameSlot(packetizer, packetizer.packets)
+
+    def _render_frame(self) -> Tuple[Image, float]:
+        return self.render_cache.get_frame_with_duration()
+
+    def _encode_frame(self, img: Image, slot: FrameSlot):
+        slot.packetizer.write_header(self.get_header())
+        self.encoder.encode_into(img, slot.packetizer)
+
+    def _transmit_frame(self, slot: FrameSlot):
+        for transfer in slot.transfers:
+            self.dev.write(self.endpoint_out, transfer)
+
+    def create_pipeline(self) -> FramePipeline:
+        """Create the render / encode / transmit pipeline driving this panel"""
+        self.pipeline = FramePipeline(self._render_frame, self._encode_frame, self._transmit_frame,
+                                      self._new_frame_slot, keep_alive=self.keep_alive_interval,
+                                      name=self.name)
+        return self.pipeline
 
     def run(self):
         self.logger.info("USB display device running")
-        while True:
-            img, delay_time = self._get_generator().get_frame_with_duration()
-            img_bytes = self.get_header() + self._encode_image(img)
-            frame_packets = self._prepare_frame_packets(img_bytes)
-            for packet in frame_packets:
-                self.dev.write(self.endpoint_out, packet)
-            time.sleep(delay_time)
+        run_devices([self])
 
 
 class DisplayDevice04185303(DisplayDevice):
-    def __init__(self, config_file: str):
-        super().__init__(0x0418, 0x5303, 64, 320, 320, config_file)
+    def __init__(self, config_file: str, path: Optional[bytes] = None,
+                 usb_device: Optional[usb.core.Device] = None):
+        super().__init__(0x0418, 0x5303, 64, 320, 320, config_file, path=path, usb_device=usb_device)
 
     def get_header(self) -> bytes:
         return struct.pack('<BBHHH', 0x69, 0x88, 320, 320, 0)
 
 
 class DisplayDevice04185304(DisplayDevice):
-    def __init__(self, config_file: str):
-        super().__init__(0x0418, 0x5304, 512, 480, 480, config_file)
+    def __init__(self, config_file: str, path: Optional[bytes] = None,
+                 usb_device: Optional[usb.core.Device] = None):
+        super().__init__(0x0418, 0x5304, 512, 480, 480, config_file, path=path, usb_device=usb_device)
 
     def get_header(self) -> bytes:
         return struct.pack('<BBHHH', 0x69, 0x88, 480, 480, 0)
 
 
 class DisplayDevice04168001(DisplayDevice):
-    def __init__(self, config_file: str):
-        super().__init__(0x0416, 0x8001, 64, 480, 480, config_file)
+    def __init__(self, config_file: str, path: Optional[bytes] = None,
+                 usb_device: Optional[usb.core.Device] = None):
+        super().__init__(0x0416, 0x8001, 64, 480, 480, config_file, path=path, usb_device=usb_device)
 
     def get_header(self) -> bytes:
         prefix = bytes([0xDA, 0xDB, 0xDC, 0xDD])
@@ -205,8 +275,9 @@ class DisplayDevice04168001(DisplayDevice):
 
 
 class DisplayDevice04165302(DisplayDevice):
-    def __init__(self, config_file: str):
-        super().__init__(0x0416, 0x5302, 512, 320, 240, config_file)
+    def __init__(self, config_file: str, path: Optional[bytes] = None,
+                 usb_device: Optional[usb.core.Device] = None):
+        super().__init__(0x0416, 0x5302, 512, 320, 240, config_file, path=path, usb_device=usb_device)
 
     def get_header(self) -> bytes:
         prefix = bytes([0xDA, 0xDB, 0xDC, 0xDD])
@@ -215,7 +286,7 @@ class DisplayDevice04165302(DisplayDevice):
 
 
 class ChiZhuDisplay(USBDisplayDevice):
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, dev: Optional[usb.core.Device] = None):
         super().__init__(
             vid=0x87ad,
             pid=0x70db,
@@ -225,34 +296,83 @@ class ChiZhuDisplay(USBDisplayDevice):
             config_file=config_file,
             endpoint_out=0x01,
             endpoint_in=0x81,
-            interface=0
+            interface=0,
+            dev=dev
         )
 
     def get_header(self) -> bytes:
         return struct.pack('<BBHHH', 0x69, 0x88, 480, 480, 0)
 
 
+HID_DEVICES = {
+    (0x0416, 0x5302): DisplayDevice04165302,
+    (0x0416, 0x8001): DisplayDevice04168001,
+    (0x0418, 0x5303): DisplayDevice04185303,
+    (0x0418, 0x5304): DisplayDevice04185304,
+}
+
+# USB-only panels, driven through pyusb instead of hidapi
+USB_DEVICES = {
+    (0x87ad, 0x70db): ChiZhuDisplay,
+}
+
+
+def device_config_file(config_file: str, vid: int, pid: int, index: int = 0) -> str:
+    """
+    Get the configuration file of one panel
+
+    A panel uses <name>-<vid>-<pid>.yaml next to the service configuration when
+    it exists (<name>-<vid>-<pid>-<index>.yaml from the second identical panel
+    onwards), and the service configuration itself otherwise.
+    """
+    base = pathlib.Path(config_file)
+    suffix = f"-{vid:04x}-{pid:04x}" + (f"-{index}" if index else "")
+    candidate = base.with_name(f"{base.stem}{suffix}{base.suffix}")
+    return str(candidate) if candidate.is_file() else config_file
+
+
+def _discover_devices(config_file: str) -> Iterator[Union[DisplayDevice, USBDisplayDevice]]:
+    """Open every connected supported panel, HID panels first"""
+    hid_infos = [info for info in hid.enumerate() if (info['vendor_id'], info['product_id']) in HID_DEVICES]
+    # Panels exposing several HID interfaces are driven through their first one
+    first_interface = {}
+    for info in hid_infos:
+        key = (info['vendor_id'], info['product_id'])
+        first_interface[key] = min(first_interface.get(key, info['interface_number']), info['interface_number'])
+
+    counts = {}
+    for info in hid_infos:
+        key = (info['vendor_id'], info['product_id'])
+        if info['interface_number'] != first_interface[key]:
+            continue
+        index = counts.get(key, 0)
+        counts[key] = index + 1
+        usb_device = find_usb_device(*key, path=info['path'], serial_number=info.get('serial_number'))
+        yield HID_DEVICES[key](device_config_file(config_file, *key, index), path=info['path'],
+                               usb_device=usb_device)
+
+    for (vid, pid), device_class in USB_DEVICES.items():
+        for index, dev in enumerate(usb.core.find(find_all=True, idVendor=vid, idProduct=pid)):
+            yield device_class(device_config_file(config_file, vid, pid, index), dev=dev)
+
+
+def load_devices(config_file: str) -> List[Union[DisplayDevice, USBDisplayDevice]]:
+    """Open every connected supported panel"""
+    try:
+        devices = list(_discover_devices(config_file))
+        if not devices:
+            raise Exception("No supported device found")
+        return devices
+    except Exception as e:
+        raise Exception(f"Device detection failed: {e}") from e
+
+
 def load_device(config_file: str) -> Optional[Union[DisplayDevice, USBDisplayDevice]]:
+    """Open the first connected supported panel"""
     try:
-        for device in hid.enumerate():
-            vid = device['vendor_id']
-            pid = device['product_id']
-            if vid == 0x0416:
-                if pid == 0x5302:
-                    return DisplayDevice04165302(config_file)
-                elif pid == 0x8001:
-                    return DisplayDevice04168001(config_file)
-            elif vid == 0x0418:
-                if pid == 0x5303:
-                    return DisplayDevice04185303(config_file)
-                elif pid == 0x5304:
-                    return DisplayDevice04185304(config_file)
-
-        # Fallback for USB-only ChiZhu panel
-        dev = usb.core.find(idVendor=0x87ad, idProduct=0x70db)
-        if dev is not None:
-            return ChiZhuDisplay(config_file)
-
-        raise Exception("No supported device found")
+        device = next(_discover_devices(config_file), None)
+        if device is None:
+            raise Exception("No supported device found")
+        return device
     except Exception as e:
         raise Exception(f"Device detection failed: {e}") from e
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .packetizer import FramePacketizer
+
+SUPPORTED_ORIENTATIONS = (0, 90, 180, 270)
+
+# Image.info keys describing a frame as an update of a previous one, see dirty_frame_info()
+FRAME_SERIAL_KEY = 'frame_serial'
+FRAME_DIRTY_KEY = 'frame_dirty'
+
+
+class ScanTable(NamedTuple):
+    """Precomputed scan order of a display geometry"""
+    order: np.ndarray  # Row-major pixel index sent at each output position
+    padding: np.ndarray  # Output positions sent as 0x00 0x00
+    positions: np.ndarray  # (height, width) output position of each image pixel
+
+
+@lru_cache(maxsize=None)
+def get_scan_table(width: int, height: int, orientation: int = 0) -> ScanTable:
+    """
+    Build the scan order for a width x height image, shared by every encoder
+
+    Pixels are sent column by column, each column scanned bottom to top, and the
+    last pixel of every column (the top row) is replaced by a 0x00 0x00 pair.
+    The orientation rotates the image clockwise before it is scanned.
+    """
+    if orientation not in SUPPORTED_ORIENTATIONS:
+        raise ValueError(f"Unsupported orientation {orientation}, expected one of {SUPPORTED_ORIENTATIONS}")
+
+    indices = np.arange(width * height, dtype=np.intp).reshape(height, width)
+    indices = np.rot90(indices, k=-(orientation // 90))
+    scan_height = indices.shape[0]
+
+    # Flip vertically then transpose: row x of the result is column x read bottom to top
+    order = np.ascontiguousarray(indices[::-1, :].T).ravel()
+    padding = np.arange(scan_height - 1, order.size, scan_height, dtype=np.intp)
+
+    positions = np.empty(order.size, dtype=np.intp)
+    positions[order] = np.arange(order.size, dtype=np.intp)
+    positions = positions.reshape(height, width)
+
+    order.setflags(write=False)
+    padding.setflags(write=False)
+    positions.setflags(write=False)
+    return ScanTable(order, padding, positions)
+
+
+def dirty_frame_info(serial: int, previous_serial: Optional[int] = None,
+                     dirty_rects: Optional[List[Tuple[int, int, int, int]]] = None) -> dict:
+    """
+    Build the Image.info entries identifying a frame for FrameEncoder
+
+    Args:
+        serial: Unique number of the frame, equal serials mean identical frames
+        previous_serial: Frame this one was derived from
+        dirty_rects: (left, top, right, bottom) boxes that differ from the previous frame
+    """
+    info = {FRAME_SERIAL_KEY: serial}
+    if previous_serial is not None and dirty_rects is not None:
+        info[FRAME_DIRTY_KEY] = (previous_serial, tuple(dirty_rects))
+    return info
+
+
+def to_rgb565(img: Image.Image) -> np.ndarray:
+    """Convert an image to a (height, width) array of RGB565 values"""
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    pixels = np.asarray(img, dtype=np.uint16)
+    return ((pixels[..., 0] & 0xF8) << 8) | ((pixels[..., 1] & 0xFC) << 3) | (pixels[..., 2] >> 3)
+
+
+class FrameEncoder:
+    """
+    RGB565 encoder bound to a display geometry
+
+    The encoder keeps the scan of the last frame. A frame whose Image.info
+    identifies it as the same frame, or as an update of that frame with a
+    few dirty boxes (see dirty_frame_info()), only re-encodes the pixels of
+    those boxes.
+    """
+
+    def __init__(self, width: int, height: int, orientation: int = 0):
+        self.width = width
+        self.height = height
+        self.orientation = orientation
+        self.scan_table = get_scan_table(width, height, orientation)
+        self._scan: Optional[np.ndarray] = None
+        self._serial: Optional[int] = None
+        self.full_encodes = 0
+        self.partial_encodes = 0
+        self.reused_encodes = 0
+
+    def _encode_full(self, img: Image.Image) -> np.ndarray:
+        scan = to_rgb565(img).ravel().take(self.scan_table.order).astype('<u2', copy=False)
+        scan[self.scan_table.padding] = 0
+        self.full_encodes += 1
+        return scan
+
+    def _encode_dirty(self, img: Image.Image, dirty_rects: Tuple[Tuple[int, int, int, int], ...]):
+        for left, top, right, bottom in dirty_rects:
+            pixels = to_rgb565(img.crop((left, top, right, bottom)))
+            self._scan[self.scan_table.positions[top:bottom, left:right]] = pixels
+        self._scan[self.scan_table.padding] = 0
+        self.partial_encodes += 1
+
+    def _encode_scan(self, img: Image.Image) -> np.ndarray:
+        """Scan of an image, the returned array is reused by the next frame"""
+        if img.size != (self.width, self.height):
+            raise ValueError(f"Image size {img.size} does not match encoder geometry {(self.width, self.height)}")
+
+        serial = img.info.get(FRAME_SERIAL_KEY)
+        dirty = img.info.get(FRAME_DIRTY_KEY)
+        if serial is not None and self._scan is not None and serial == self._serial:
+            self.reused_encodes += 1
+        elif serial is not None and self._scan is not None and dirty and dirty[0] == self._serial:
+            self._encode_dirty(img, dirty[1])
+        else:
+            self._scan = self._encode_full(img)
+        self._serial = serial
+        return self._scan
+
+    def encode_array(self, img: Image.Image) -> np.ndarray:
+        """Return the scan-ordered RGB565 values of an image as little-endian uint16"""
+        return self._encode_scan(img).copy()
+
+    def encode(self, img: Image.Image) -> bytearray:
+        """Encode an image to the RGB565 little-endian stream expected by the panels"""
+        return bytearray(self._encode_scan(img).tobytes())
+
+    def encode_into(self, img: Image.Image, packetizer: FramePacketizer):
+        """Encode an image directly into the payload area of a packetizer buffer"""
+        packetizer.write_payload(self._encode_scan(img))
+
+    def get_stats(self) -> dict:
+        """Get the number of full, partial and reused encodes"""
+        return {
+            'full_encodes': self.full_encodes,
+            'partial_encodes': self.partial_encodes,
+            'reused_encodes': self.reused_encodes
+        }
+
+
+def encode_rgb565(img: Image.Image, orientation: int = 0) -> bytearray:
+    """Encode an image using the shared scan table of its geometry"""
+    width, height = img.size
+    return FrameEncoder(width, height, orientation).encode(img)
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from PIL import Image
+
+
+def image_size_bytes(image: Image.Image) -> int:
+    """Approximate memory used by the pixels of an image"""
+    return image.width * image.height * len(image.getbands())
+
+
+def compact_frame(frame: Image.Image) -> Image.Image:
+    """Drop the alpha channel of a fully opaque RGBA frame, saving a quarter of its memory"""
+    if frame.mode == 'RGBA' and frame.getextrema()[3] == (255, 255):
+        return frame.convert('RGB')
+    return frame
+
+
+def expand_frame(frame: Image.Image) -> Image.Image:
+    """Get a new RGBA image from a cached frame, leaving the cached one untouched"""
+    return frame.convert('RGBA') if frame.mode != 'RGBA' else frame.copy()
+
+
+class FrameCache:
+    """
+    Least recently used images, bounded by the memory of their pixels
+
+    Images are stored as given and must not be modified by readers. The most
+    recently inserted image is always kept, even if it alone exceeds the
+    budget, so a single oversized frame does not defeat the cache.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        """Get an image and mark it as recently used, None if it is not cached"""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key: Hashable, image: Image.Image):
+        """Store an image, evicting the least recently used ones beyond max_bytes"""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= image_size_bytes(previous)
+            self._entries[key] = image
+            self.current_bytes += image_size_bytes(image)
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= image_size_bytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache occupancy and hit/miss counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -4,19 +4,21 @@
 import glob
 import logging
 import os
-import threading
 import time
-from typing import Tuple
+from typing import Hashable, Tuple
 
-from PIL import Image, ImageSequence
+from PIL import Image
 
+from .asset_cache import load_scaled_image
 from .config import BackgroundType, DisplayConfig
-from ..metrics.cpu_metrics import CpuMetrics
-from ..metrics.gpu_metrics import GpuMetrics
+from .gif_frames import GifFrames
+from .image_collection import ImageCollection
+from ..metrics.sampler import MetricsSampler
 
 # Try to import OpenCV for video support
 try:
-    import cv2
+    from .video_cache import VideoCache
+    from .video_decoder import VideoDecoder
 
     HAS_OPENCV = True
 except ImportError:
@@ -36,29 +38,18 @@ class FrameManager:
         # Variables for managing backgrounds
         self.current_frame_index = 0
         self.background_frames = []
-        self.video_capture = None
+        self.gif_frames = None
+        self.video_decoder = None
+        self.video_frame_number = 0
         self.image_collection = []
+        self.collection_frames = None
         self.frame_duration = 1.0  # Default duration
         self.frame_start_time = 0
-        self.metrics_thread = None
-        self.metrics_running = False
-        self.metrics_lock = threading.Lock()
-        if len(config.metrics_configs) != 0  :
-            # Initialize metrics collectors
-            self.cpu_metrics = CpuMetrics()
-            self.gpu_metrics = GpuMetrics()
-            # Variables for real-time metrics
-            self.current_metrics = self._get_current_metric()
-            # Start metrics update
-            self._start_metrics_update()
+        if len(config.metrics_configs) != 0:
+            # Metrics are collected by the sampler shared with every other display
+            self.metrics_sampler = MetricsSampler.acquire()
         else:
-            self.cpu_metrics = None
-            self.gpu_metrics = None
-            self.current_metrics = {}
-
-
-
-
+            self.metrics_sampler = None
 
         # Load background
         self._load_background()
@@ -96,7 +87,7 @@ class FrameManager:
                 self._load_image_collection()
                 self.frame_duration = 1.0  # 1 second per image by default
 
-            self.frame_start_time = time.time()
+            self.frame_start_time = time.monotonic()
             self.logger.info(
                 f"Background loaded: {self.config.background_type}, frame_duration: {self.frame_duration}s")
 
@@ -109,36 +100,21 @@ class FrameManager:
         if not os.path.exists(self.config.background_path):
             raise FileNotFoundError(f"Background image not found: {self.config.background_path}")
 
-        image = Image.open(self.config.background_path)
-        image = image.resize((self.config.output_width, self.config.output_height), Image.Resampling.LANCZOS)
-        if image.mode != 'RGBA':
-            image = image.convert('RGBA')
+        image = load_scaled_image(self.config.background_path,
+                                  (self.config.output_width, self.config.output_height))
         self.background_frames = [image]
 
     def _load_gif(self):
-        """Load an animated GIF and retrieve duration from metadata"""
+        """Open an animated GIF, its frames are decoded when first shown"""
         if not os.path.exists(self.config.background_path):
             raise FileNotFoundError(f"Background GIF not found: {self.config.background_path}")
 
-        gif = Image.open(self.config.background_path)
-        self.background_frames = []
-
-        # Extract all frames from GIF
-        for frame in ImageSequence.Iterator(gif):
-            frame_copy = frame.copy()
-            frame_copy = frame_copy.resize((self.config.output_width, self.config.output_height),
-                                           Image.Resampling.LANCZOS)
-            if frame_copy.mode != 'RGBA':
-                frame_copy = frame_copy.convert('RGBA')
-            self.background_frames.append(frame_copy)
-
-        # Get duration from GIF metadata
-        try:
-            self.frame_duration = gif.info.get('duration', 100) / 1000.0  # Convert ms to seconds
-        except:
-            self.frame_duration = 0.1  # Default fallback
+        self.gif_frames = GifFrames(self.config.background_path,
+                                    self.config.output_width, self.config.output_height)
+        # Get duration of the first frame from GIF metadata
+        self.frame_duration = self.gif_frames.get_duration(0)
 
-        self.logger.debug(f"GIF loaded: {len(self.background_frames)} frames, duration: {self.frame_duration}s")
+        self.logger.debug(f"GIF loaded: {len(self.gif_frames)} frames, first frame duration: {self.frame_duration}s")
 
     def _load_video(self):
         """Load a video and retrieve FPS from metadata"""
@@ -154,23 +130,31 @@ class FrameManager:
             raise RuntimeError(
                 f"Unsupported video format '{file_ext}'. Supported formats: {', '.join(self.SUPPORTED_VIDEO_FORMATS)}")
 
-        self.video_capture = cv2.VideoCapture(self.config.background_path)
-        if not self.video_capture.isOpened():
-            raise RuntimeError(
-                f"Cannot open video: {self.config.background_path}. Please check if the file is corrupted or if OpenCV supports this codec.")
+        try:
+            video_cache = VideoCache()
+        except OSError as e:
+            self.logger.warning(f"Video cache disabled: {e}")
+            video_cache = None
+
+        # Frames are decoded and scaled ahead of playback on the decoder thread
+        self.video_decoder = VideoDecoder(self.config.background_path,
+                                          self.config.output_width, self.config.output_height,
+                                          self.config.video_buffer_depth, video_cache)
+        self.video_decoder.start()
 
         # Get video properties
-        fps = self.video_capture.get(cv2.CAP_PROP_FPS)
-        frame_count = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = self.video_decoder.fps
+        frame_count = self.video_decoder.frame_count
         duration = frame_count / fps if fps > 0 else 0
 
-        self.frame_duration = 1.0 / fps if fps > 0 else 1.0 / 30  # Fallback 30 FPS
+        self.frame_duration = self.video_decoder.frame_duration
 
         self.logger.info(f"Video loaded: {os.path.basename(self.config.background_path)}")
         self.logger.info(f"  Format: {os.path.splitext(self.config.background_path)[1].upper()}")
         self.logger.info(f"  FPS: {fps:.2f}")
         self.logger.info(f"  Duration: {duration:.1f}s")
         self.logger.info(f"  Frame duration: {self.frame_duration:.3f}s")
+        self.logger.info(f"  Buffer depth: {self.video_decoder.buffer_depth} frames")
 
     def _load_image_collection(self):
         """Load an image collection from a folder"""
@@ -191,103 +175,85 @@ class FrameManager:
             raise RuntimeError(f"No images found in directory: {self.config.background_path}")
 
         self.image_collection = image_files
+        self.collection_frames = ImageCollection(image_files, self.config.output_width, self.config.output_height)
+        self.collection_frames.prefetch(0)
         self.logger.debug(f"Image collection loaded: {len(image_files)} images")
 
-    def _start_metrics_update(self):
-        """Start the metrics update thread every second"""
-        self.metrics_running = True
-        self.metrics_thread = threading.Thread(target=self._metrics_update_loop, daemon=True)
-        self.metrics_thread.start()
-        self.logger.debug("Metrics update thread started")
+    def _elapsed_frames(self, current_time: float) -> int:
+        """Number of frame slots elapsed since the current frame started, advancing the frame clock"""
+        elapsed = current_time - self.frame_start_time
+        if elapsed < self.frame_duration:
+            return 0
+        if self.frame_duration <= 0:
+            self.frame_start_time = current_time
+            return 1
+
+        steps = int(elapsed // self.frame_duration)
+        self.frame_start_time += steps * self.frame_duration
+        return steps
+
+    def _advance_gif(self, current_time: float):
+        """Move to the GIF frame shown at current_time, following the duration of each frame"""
+        elapsed = current_time - self.frame_start_time
+        if elapsed < self.frame_duration:
+            return
+
+        # Skip whole loops at once once every frame duration is known
+        loop_duration = self.gif_frames.get_loop_duration()
+        if loop_duration and elapsed >= loop_duration:
+            loops = int(elapsed // loop_duration)
+            self.frame_start_time += loops * loop_duration
+            elapsed -= loops * loop_duration
+
+        while elapsed >= self.frame_duration:
+            self.frame_start_time += self.frame_duration
+            elapsed -= self.frame_duration
+            self.current_frame_index = (self.current_frame_index + 1) % len(self.gif_frames)
+            self.frame_duration = self.gif_frames.get_duration(self.current_frame_index)
+
+    def advance_frame(self) -> Hashable:
+        """
+        Move the background to the frame of the current time, without producing it
 
-    def _metrics_update_loop(self):
-        """Metrics update loop every second"""
-        while self.metrics_running:
-            try:
-                with self.metrics_lock:
-                    self.current_metrics = self._get_current_metric()
+        Returns:
+            Hashable: Key identifying the background frame, equal keys mean an identical frame
+        """
+        current_time = time.monotonic()
 
-                time.sleep(1.0)  # Update every second
+        if self.config.background_type == BackgroundType.GIF:
+            # Check if we need to change frame, skipping the ones whose slot already passed
+            self._advance_gif(current_time)
 
-            except Exception as e:
-                self.logger.error(f"Error updating metrics: {e}")
-                time.sleep(1.0)
+        elif self.config.background_type == BackgroundType.IMAGE_COLLECTION:
+            # Check if we need to change frame, skipping the ones whose slot already passed
+            steps = self._elapsed_frames(current_time)
+            if steps:
+                self.current_frame_index = (self.current_frame_index + steps) % len(self._get_frame_source())
 
-    def _get_current_metric(self):
-        try:
-            # Collect CPU and GPU metrics
-            cpu_data = self.cpu_metrics.get_all_metrics()
-            gpu_data = self.gpu_metrics.get_all_metrics()
-            # Update metrics in a thread-safe manner
-            return {
-                # CPU metrics
-                'cpu_temperature': cpu_data.get('temperature'),
-                'cpu_usage': cpu_data.get('usage_percentage'),
-                'cpu_frequency': cpu_data.get('frequency'),
-
-                # GPU metrics
-                'gpu_temperature': gpu_data.get('temperature'),
-                'gpu_usage': gpu_data.get('usage_percentage'),
-                'gpu_frequency': gpu_data.get('frequency'),
-                'gpu_vendor': gpu_data.get('vendor'),
-                'gpu_name': gpu_data.get('name')
-            }
-        except Exception as e:
-            self.logger.error(f"Error updating metrics: {e}")
-            raise e
+        elif self.video_decoder:
+            # Pick the decoded frame matching the current timestamp
+            self.video_frame_number = int((current_time - self.frame_start_time) / self.frame_duration)
+            self.current_frame_index = self.video_frame_number % max(self.video_decoder.frame_count, 1)
+            return self.video_frame_number
 
-    def get_current_frame(self) -> Image.Image:
-        """Get the current background frame"""
-        current_time = time.time()
+        return self.current_frame_index
 
+    def get_frame(self) -> Image.Image:
+        """Get the background frame selected by the last advance_frame(), it must not be modified"""
         if self.config.background_type == BackgroundType.IMAGE:
             return self.background_frames[0]
 
-        elif self.config.background_type in [BackgroundType.GIF, BackgroundType.IMAGE_COLLECTION]:
-            # Check if we need to change frame
-            if current_time - self.frame_start_time >= self.frame_duration:
-                self.current_frame_index = (self.current_frame_index + 1) % len(self._get_frame_source())
-                self.frame_start_time = current_time
-
-            if self.config.background_type == BackgroundType.GIF:
-                return self.background_frames[self.current_frame_index]
-            else:  # IMAGE_COLLECTION
-                image_path = self.image_collection[self.current_frame_index]
-                image = Image.open(image_path)
-                image = image.resize((self.config.output_width, self.config.output_height), Image.Resampling.LANCZOS)
-                if image.mode != 'RGBA':
-                    image = image.convert('RGBA')
-                return image
+        elif self.config.background_type == BackgroundType.GIF:
+            return self.gif_frames.get_frame(self.current_frame_index)
+
+        elif self.config.background_type == BackgroundType.IMAGE_COLLECTION:
+            return self.collection_frames.get_frame(self.current_frame_index)
 
         elif self.config.background_type == BackgroundType.VIDEO:
-            if HAS_OPENCV and self.video_capture:
-                # Check if we need to read the next frame
-                if current_time - self.frame_start_time >= self.frame_duration:
-                    self.frame_start_time = current_time
-
-                    # Read next video frame
-                    ret, frame = self.video_capture.read()
-                    if not ret:
-                        # Restart video from beginning
-                        self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                        ret, frame = self.video_capture.read()
-
-                    if ret:
-                        # Convert BGR (OpenCV) to RGB (PIL)
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        image = Image.fromarray(frame_rgb)
-                        image = image.resize((self.config.output_width, self.config.output_height),
-                                             Image.Resampling.LANCZOS)
-                        if image.mode != 'RGBA':
-                            image = image.convert('RGBA')
-
-                        # Store current frame
-                        self._current_video_frame = image
-                        return image
-                else:
-                    # Return already loaded frame
-                    if hasattr(self, '_current_video_frame'):
-                        return self._current_video_frame
+            if self.video_decoder:
+                image = self.video_decoder.get_frame(self.video_frame_number, timeout=1.0)
+                if image is not None:
+                    return image
             else:
                 # Fallback to static image behavior if OpenCV not available
                 if self.background_frames:
@@ -296,6 +262,11 @@ class FrameManager:
         # Fallback
         return Image.new('RGBA', (self.config.output_width, self.config.output_height), (0, 0, 0, 255))
 
+    def get_current_frame(self) -> Image.Image:
+        """Get the current background frame"""
+        self.advance_frame()
+        return self.get_frame()
+
     def get_current_frame_info(self) -> Tuple[int, float]:
         """
         Get information about the current frame
@@ -305,27 +276,46 @@ class FrameManager:
         """
         return (self.current_frame_index, self.frame_duration)
 
+    def get_video_stats(self) -> dict:
+        """Get the video decoder buffer and dropped/late frame counters"""
+        if self.video_decoder is None:
+            return {}
+        return self.video_decoder.get_stats()
+
     def get_current_metrics(self) -> dict:
         """Get current metrics in a thread-safe manner"""
-        with self.metrics_lock:
-            return self.current_metrics.copy()
+        if self.metrics_sampler is None:
+            return {}
+        return self.metrics_sampler.get_metrics()
 
     def _get_frame_source(self):
         """Return the appropriate frame source"""
         if self.config.background_type == BackgroundType.GIF:
-            return self.background_frames
+            return self.gif_frames
         elif self.config.background_type == BackgroundType.IMAGE_COLLECTION:
             return self.image_collection
         return []
 
     def cleanup(self):
         """Clean up resources"""
-        self.metrics_running = False
-        if self.metrics_thread:
-            self.metrics_thread.join(timeout=2.0)
-
-        if self.video_capture:
-            self.video_capture.release()
+        sampler, self.metrics_sampler = self.metrics_sampler, None
+        if sampler:
+            sampler.release()
+
+        gif_frames, self.gif_frames = self.gif_frames, None
+        if gif_frames:
+            self.logger.debug(f"GIF frame cache stats: {gif_frames.cache.get_stats()}")
+            gif_frames.close()
+
+        collection_frames, self.collection_frames = self.collection_frames, None
+        if collection_frames:
+            self.logger.debug(f"Image collection cache stats: {collection_frames.cache.get_stats()}")
+            collection_frames.close()
+
+        decoder, self.video_decoder = self.video_decoder, None
+        if decoder:
+            self.logger.debug(f"Video decoder stats: {decoder.get_stats()}")
+            decoder.stop()
 
         self.logger.debug("FrameManager cleaned up")
 
@@ -2,14 +2,16 @@
 # Copyright © 2025 Rejeb Ben Rejeb
 
 import os
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
+from .asset_cache import load_scaled_image
+from .compositor import LayerCompositor
 from .config import DisplayConfig
 from .frame_manager import FrameManager
+from .render_plan import RenderPlan
 from .text_renderer import TextRenderer
-from .utils import async_background
 from ...common.logging_config import LoggerConfig
 
 
@@ -23,60 +25,45 @@ class DisplayGenerator:
         # Initialize components
         self.frame_manager = FrameManager(config)
         self.text_renderer = TextRenderer(config)  # Pass config for global font
+        # Texts of each frame, compiled once from the configuration
+        self.render_plan = RenderPlan.compile(config, self.text_renderer)
+
+        # The foreground is prepared once, then composed by the layer compositor
+        self.foreground = self._load_foreground_image()
+        self.compositor = LayerCompositor(self.frame_manager, self.text_renderer,
+                                          self.foreground, self.config.foreground_position)
 
         self.logger.info(f"DisplayGenerator initialized with background type: {self.config.background_type}")
         self.logger.info(f"Global font: {self.config.global_font_path or 'Default system font'}")
 
-    def _add_foreground_image(self, background: Image.Image) -> Image.Image:
-        """Add foreground image to background"""
+    def _load_foreground_image(self) -> Optional[Image.Image]:
+        """Load the foreground image with the configured transparency applied"""
         if not self.config.foreground_image_path or not os.path.exists(self.config.foreground_image_path):
-            return background
+            return None
 
         try:
-            foreground = Image.open(self.config.foreground_image_path)
-            if foreground.mode != 'RGBA':
-                foreground = foreground.convert('RGBA')
+            foreground = load_scaled_image(self.config.foreground_image_path)
 
             # Apply transparency
             if self.config.foreground_alpha < 1.0:
                 alpha = foreground.split()[-1]  # Alpha channel
-                alpha = alpha.point(lambda p: int(p * self.config.foreground_alpha))
+                alpha = alpha.point([int(p * self.config.foreground_alpha) for p in range(256)])
                 foreground.putalpha(alpha)
-
-            # Compose foreground image
-            result = background.copy()
-            result.paste(foreground, self.config.foreground_position, foreground)
-            return result
+            return foreground
 
         except Exception as e:
             self.logger.warning(f"Cannot load foreground image: {e}")
-            return background
+            return None
 
-    def generate_frame_with_metrics(self,metrics:dict) -> Image.Image:
+    def generate_frame_with_metrics(self, metrics: dict) -> Image.Image:
         """
         Generate a complete frame with all elements and real-time metrics
-        """
-        # Get current background
-        background = self.frame_manager.get_current_frame()
-
-        # Add foreground image if configured
-        result = self._add_foreground_image(background)
-
-        # Create drawing object
-        draw = ImageDraw.Draw(result)
-
 
-
-        # Draw metrics
-        self.text_renderer.render_metrics(draw, metrics, self.config.metrics_configs)
-
-        # Draw date (dd/mm format)
-        self.text_renderer.render_date(draw, self.config.date_config)
-
-        # Draw time (HH:MM format)
-        self.text_renderer.render_time(draw, self.config.time_config)
-
-        return result.convert('RGB')
+        Metrics, date (dd/mm) and time (HH:MM) are drawn over the background and
+        foreground layers, which are only recomposed when the background changes.
+        """
+        text_items = self.render_plan.execute(metrics)
+        return self.compositor.compose(text_items)
 
     def generate_frame(self) -> Image.Image:
         # Get current real-time metrics
@@ -108,6 +95,15 @@ class DisplayGenerator:
         """
         return self.frame_manager.get_current_frame_info()
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get layer recomputation and text sprite counters, with video decoder counters for video backgrounds"""
+        stats = self.compositor.get_stats()
+        stats['text_sprites'] = self.text_renderer.get_stats()
+        video_stats = self.frame_manager.get_video_stats()
+        if video_stats:
+            stats['video'] = video_stats
+        return stats
+
     def get_current_metrics(self) -> Dict[str, Any]:
         """Get current metrics"""
         return self.frame_manager.get_current_metrics()
@@ -130,7 +126,6 @@ class DisplayGenerator:
         self.logger.debug(f"Frame saved to: {output_path} (duration: {duration}s)")
         return duration
 
-    @async_background
     def cleanup(self):
         """Clean up resources"""
         self.frame_manager.cleanup()
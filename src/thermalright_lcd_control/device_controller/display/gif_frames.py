@@ -0,0 +1,78 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import threading
+from typing import List, Optional
+
+from PIL import Image
+
+from .frame_cache import FrameCache, compact_frame, expand_frame
+
+
+class GifFrames:
+    """
+    Animated GIF frames decoded and scaled on demand
+
+    Frames are only decoded when first shown and are kept in a FrameCache
+    bounded to max_bytes, so a short GIF stays resident while a long one
+    costs no more than the budget. Opaque frames are stored as RGB instead of
+    RGBA. Every frame keeps its own duration from the GIF metadata, known as
+    soon as the frame has been decoded once.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    DEFAULT_DURATION_MS = 100
+
+    def __init__(self, gif_path: str, width: int, height: int, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.gif_path = gif_path
+        self.width = width
+        self.height = height
+        self.cache = FrameCache(max_bytes)
+        self._gif = Image.open(gif_path)
+        self.frame_count = getattr(self._gif, 'n_frames', 1)
+        self._durations: List[Optional[float]] = [None] * self.frame_count
+        self._loop_duration: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def _decode(self, index: int) -> Image.Image:
+        with self._lock:
+            self._gif.seek(index)
+            # A missing or zero delay is played at the usual 100 ms
+            duration_ms = self._gif.info.get('duration') or self.DEFAULT_DURATION_MS
+            self._durations[index] = duration_ms / 1000.0  # Convert ms to seconds
+
+            frame = self._gif.copy()
+            frame = frame.resize((self.width, self.height), Image.Resampling.LANCZOS)
+            if frame.mode != 'RGBA':
+                frame = frame.convert('RGBA')
+            frame = compact_frame(frame)
+        self.cache.put(index, frame)
+        return frame
+
+    def get_frame(self, index: int) -> Image.Image:
+        """Get a frame as a new RGBA image"""
+        frame = self.cache.get(index)
+        if frame is None:
+            frame = self._decode(index)
+        return expand_frame(frame)
+
+    def get_duration(self, index: int) -> float:
+        """Get the display duration of a frame in seconds, decoding it if it was never shown"""
+        duration = self._durations[index]
+        if duration is None:
+            self._decode(index)
+            duration = self._durations[index]
+        return duration
+
+    def get_loop_duration(self) -> Optional[float]:
+        """Get the duration of a whole loop, None until every frame was decoded once"""
+        if self._loop_duration is None and None not in self._durations:
+            self._loop_duration = sum(self._durations)
+        return self._loop_duration
+
+    def close(self):
+        self._gif.close()
+        self.cache.clear()
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+Glyph = Tuple[np.ndarray, int, int, int]
+
+
+class GlyphAtlas:
+    """
+    Pre-rasterised glyphs of one font, composed into text masks without FreeType
+
+    Glyphs are laid out like the basic layout of Pillow: advances and kerning
+    in 1/64 pixels, each glyph placed at its rounded pen position and blended
+    over the previous ones, so composed masks are identical to the ones
+    FreeType renders. Texts with characters outside the atlas are not
+    composed. The font is assumed not to substitute glyphs between these
+    characters, which holds for digits, punctuation and units.
+    """
+
+    # Characters of metric values, dates and times
+    BASE_CHARACTERS = "0123456789.,:/-+ %°N/A"
+
+    def __init__(self, font: ImageFont.FreeTypeFont, characters: Iterable[str] = ""):
+        self.font = font
+        self._glyphs: Dict[str, Glyph] = {}
+        self._kerning: Dict[Tuple[str, str], int] = {}
+        for character in set(self.BASE_CHARACTERS) | set(characters):
+            if character != '\n':
+                self._glyphs[character] = self._rasterise(character)
+
+    def _advance(self, text: str) -> int:
+        return round(self.font.getlength(text) * 64)
+
+    def _rasterise(self, character: str) -> Glyph:
+        left, top, right, bottom = self.font.getbbox(character)
+        mask = Image.new('L', (max(right - left, 0), max(bottom - top, 0)))
+        ImageDraw.Draw(mask).text((-left, -top), character, fill=255, font=self.font)
+        return np.asarray(mask, dtype=np.uint16), left, top, self._advance(character)
+
+    def _kern(self, previous: str, character: str) -> int:
+        pair = (previous, character)
+        kerning = self._kerning.get(pair)
+        if kerning is None:
+            kerning = self._advance(previous + character) - self._glyphs[previous][3] - self._glyphs[character][3]
+            self._kerning[pair] = kerning
+        return kerning
+
+    def __contains__(self, text: str) -> bool:
+        return all(character in self._glyphs for character in text)
+
+    def compose(self, text: str) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """
+        Compose the mask of a text from its glyphs
+
+        Returns:
+            (mask, (left, top)) with the offset of the mask from the text position,
+            None if a character is not in the atlas
+        """
+        if text not in self:
+            return None
+
+        placed = []
+        pen = 0
+        previous = None
+        for character in text:
+            mask, left, top, advance = self._glyphs[character]
+            if previous is not None:
+                pen += self._kern(previous, character)
+            if mask.size:
+                placed.append((mask, ((pen + 32) >> 6) + left, top))
+            pen += advance
+            previous = character
+        if not placed:
+            return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+
+        x0 = min(x for _, x, _ in placed)
+        y0 = min(y for _, _, y in placed)
+        x1 = max(x + mask.shape[1] for mask, x, _ in placed)
+        y1 = max(y + mask.shape[0] for mask, _, y in placed)
+        out = np.zeros((y1 - y0, x1 - x0), dtype=np.uint16)
+        for mask, x, y in placed:
+            region = out[y - y0:y - y0 + mask.shape[0], x - x0:x - x0 + mask.shape[1]]
+            # Overlapping glyphs are blended over each other, with a rounded division by 255
+            blended = region * (255 - mask) + 128
+            region[...] = mask + ((blended + (blended >> 8)) >> 8)
+        return out.astype(np.uint8), (x0, y0)
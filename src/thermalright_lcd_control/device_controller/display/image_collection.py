@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from PIL import Image
+
+from .asset_cache import load_scaled_image
+from .frame_cache import FrameCache, compact_frame, expand_frame
+
+
+class ImageCollection:
+    """
+    Slides of an image collection, scaled once and prefetched ahead of their slot
+
+    Showing a slide queues the decoding of the next one on a single background
+    worker, so the slide change does not wait for a JPEG decode and resize.
+    Scaled slides are kept in a FrameCache bounded to max_bytes, which keeps
+    short collections fully resident.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, image_files: List[str], width: int, height: int, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = logging.getLogger('thermalright.display.image_collection')
+        self.image_files = image_files
+        self.width = width
+        self.height = height
+        self.cache = FrameCache(max_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slide-prefetch")
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.image_files)
+
+    def _load(self, index: int) -> Image.Image:
+        image = load_scaled_image(self.image_files[index], (self.width, self.height))
+        image = compact_frame(image)
+        self.cache.put(index, image)
+        return image
+
+    def _prefetch_done(self, index: int, future: Future):
+        with self._lock:
+            if self._pending.get(index) is future:
+                del self._pending[index]
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.warning(f"Cannot prefetch {self.image_files[index]}: {future.exception()}")
+
+    def prefetch(self, index: int):
+        """Decode a slide in the background unless it is cached or already queued"""
+        index %= len(self.image_files)
+        if index in self.cache:
+            return
+        with self._lock:
+            if index in self._pending:
+                return
+            future = self._executor.submit(self._load, index)
+            self._pending[index] = future
+        future.add_done_callback(lambda done: self._prefetch_done(index, done))
+
+    def get_frame(self, index: int) -> Image.Image:
+        """Get a slide as a new RGBA image and start prefetching the next one"""
+        image = self.cache.get(index)
+        if image is None:
+            with self._lock:
+                future = self._pending.get(index)
+            if future is not None and not future.cancelled():
+                try:
+                    # The slide is being prefetched, waiting is cheaper than decoding it twice
+                    image = future.result()
+                except Exception:
+                    image = None
+            if image is None:
+                image = self._load(index)
+        self.prefetch(index + 1)
+        return expand_frame(image)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.clear()
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import array
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+class FramePacketizer:
+    """
+    Preallocated report buffer holding one frame split into fixed size packets
+
+    The buffer is laid out as consecutive packets of [report ID][chunk], so the
+    header and the encoded payload are written in place and every packet is
+    handed out as a memoryview slice without any per-frame allocation. The
+    unused tail of the last chunk stays zero-filled. Without a report ID the
+    buffer is simply the contiguous frame padded to a whole number of chunks.
+    """
+
+    def __init__(self, header_size: int, payload_size: int, chunk_size: int, report_id: Optional[int] = 0x00):
+        self.header_size = header_size
+        self.payload_size = payload_size
+        self.chunk_size = chunk_size
+        self.report_id = report_id
+
+        prefix_size = 0 if report_id is None else 1
+        self.stride = prefix_size + chunk_size
+        self.packet_count = -(-(header_size + payload_size) // chunk_size)
+        # array.array lets pyusb submit the buffer as-is instead of copying it into one
+        self.buffer = array.array('B', bytes(self.packet_count * self.stride))
+
+        rows = np.frombuffer(self.buffer, dtype=np.uint8).reshape(self.packet_count, self.stride)
+        if report_id is not None:
+            rows[:, 0] = report_id
+        # Strided view of the logical header + payload stream, one row per chunk
+        self._stream = rows[:, prefix_size:]
+
+        view = memoryview(self.buffer)
+        self.packets: List[memoryview] = [view[i * self.stride:(i + 1) * self.stride]
+                                          for i in range(self.packet_count)]
+
+    def _write(self, offset: int, data: np.ndarray):
+        """Copy a flat uint8 array into the stream starting at the given offset"""
+        size = data.size
+        row, col = divmod(offset, self.chunk_size)
+        pos = 0
+
+        if col:
+            count = min(self.chunk_size - col, size)
+            self._stream[row, col:col + count] = data[:count]
+            pos += count
+            row += 1
+
+        full_rows = (size - pos) // self.chunk_size
+        if full_rows:
+            end = pos + full_rows * self.chunk_size
+            self._stream[row:row + full_rows] = data[pos:end].reshape(full_rows, self.chunk_size)
+            pos = end
+            row += full_rows
+
+        if pos < size:
+            self._stream[row, :size - pos] = data[pos:]
+
+    def transfers(self, transfer_size: Optional[int] = None) -> List[Union[array.array, memoryview]]:
+        """
+        Split the buffer into large transfers made of whole packets
+
+        Args:
+            transfer_size: Maximum bytes per transfer, None for a single transfer of the whole buffer
+        """
+        if transfer_size is None or transfer_size >= len(self.buffer):
+            return [self.buffer]
+
+        step = max(transfer_size // self.stride, 1) * self.stride
+        view = memoryview(self.buffer)
+        return [view[i:i + step] for i in range(0, len(self.buffer), step)]
+
+    def write_header(self, header: bytes):
+        """Write the frame header at the start of the stream"""
+        if len(header) != self.header_size:
+            raise ValueError(f"Header size {len(header)} does not match packetizer header size {self.header_size}")
+        self._write(0, np.frombuffer(header, dtype=np.uint8))
+
+    def write_payload(self, payload: np.ndarray):
+        """Write the encoded frame right after the header"""
+        data = payload.view(np.uint8).reshape(-1)
+        if data.size != self.payload_size:
+            raise ValueError(f"Payload size {data.size} does not match packetizer payload size {self.payload_size}")
+        self._write(self.header_size, data)
@@ -0,0 +1,187 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import asyncio
+import time
+import zlib
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .packetizer import FramePacketizer
+from .scheduler import FrameScheduler
+from ...common.logging_config import LoggerConfig
+
+
+class FrameSlot:
+    """Preallocated frame buffer travelling between the encode and transmit stages"""
+
+    def __init__(self, packetizer: FramePacketizer, transfers: List[Any]):
+        self.packetizer = packetizer
+        self.transfers = transfers
+        # Checksum of the encoded buffer, set by the encode stage when deduplication is enabled
+        self.checksum: Optional[int] = None
+
+
+class FramePipeline:
+    """
+    Render, encode and transmit frames as concurrent asyncio stages
+
+    Stages are connected by small bounded queues, so a slow stage blocks the
+    ones before it instead of letting frames pile up, and throughput is bound
+    by the slowest stage rather than by the sum of all of them. Rendering is
+    paced by a FrameScheduler against absolute frame deadlines. With a
+    keep_alive interval, rendering is change driven: a frame identical to the
+    previous one, which renderers signal by returning the same image object,
+    is neither encoded nor sent until keep_alive seconds passed since the last
+    frame that was. The transmit stage also skips the device write when the
+    encoded buffer has the same checksum as the last one written, which
+    catches identical frames rendered into new images, with the same
+    keep_alive interval forcing a refresh. The blocking
+    work of each stage runs on executors owned by the caller: image work on a
+    shared executor, device writes on an executor dedicated to the panel.
+    Frame buffers are recycled through a pool of FrameSlot objects, which
+    keeps the encoder from overwriting a buffer that is still being sent.
+    """
+
+    def __init__(self,
+                 render: Callable[[], Tuple[Image.Image, float]],
+                 encode: Callable[[Image.Image, FrameSlot], None],
+                 transmit: Callable[[FrameSlot], None],
+                 slot_factory: Callable[[], FrameSlot],
+                 render_queue_size: int = 1,
+                 transmit_queue_size: int = 1,
+                 keep_alive: Optional[float] = None,
+                 name: str = "display"):
+        self.logger = LoggerConfig.setup_service_logger()
+        self.name = name
+        self._render = render
+        self._encode = encode
+        self._transmit = transmit
+        self._slot_factory = slot_factory
+        self.render_queue_size = render_queue_size
+        self.transmit_queue_size = transmit_queue_size
+        self.keep_alive = keep_alive
+
+        # Queues are bound to the running loop, they are created by run()
+        self.render_queue: Optional[asyncio.Queue] = None
+        self.transmit_queue: Optional[asyncio.Queue] = None
+        self.free_slots: Optional[asyncio.Queue] = None
+
+        self.scheduler = FrameScheduler()
+        self.frames_sent = 0
+        self.suppressed_frames = 0
+        self.duplicate_frames = 0
+        self.duplicate_bytes = 0
+        self._last_image: Optional[Image.Image] = None
+        self._last_queued = 0.0
+        self._last_checksum: Optional[int] = None
+        self._last_sent = 0.0
+
+    async def _render_loop(self, loop: asyncio.AbstractEventLoop, executor: Executor):
+        while True:
+            await asyncio.sleep(self.scheduler.delay())
+            self.scheduler.start_frame()
+            img, duration = await loop.run_in_executor(executor, self._render)
+            if self._is_unchanged(img):
+                self.suppressed_frames += 1
+            else:
+                await self.render_queue.put((img, duration))
+                self._last_image = img
+                self._last_queued = time.monotonic()
+            self.scheduler.schedule_next(duration)
+
+    def _is_unchanged(self, img: Image.Image) -> bool:
+        """Check if a frame repeats the last queued one and the keep-alive is not due yet"""
+        if self.keep_alive is None or img is not self._last_image:
+            return False
+        return time.monotonic() - self._last_queued < self.keep_alive
+
+    async def _encode_loop(self, loop: asyncio.AbstractEventLoop, executor: Executor):
+        while True:
+            img, _ = await self.render_queue.get()
+            slot = await self.free_slots.get()
+            await loop.run_in_executor(executor, self._encode_slot, img, slot)
+            await self.transmit_queue.put(slot)
+
+    def _encode_slot(self, img: Image.Image, slot: FrameSlot):
+        self._encode(img, slot)
+        if self.keep_alive is not None:
+            # A collision would only delay a frame until the next forced refresh
+            slot.checksum = zlib.crc32(slot.packetizer.buffer)
+        else:
+            slot.checksum = None
+
+    def _is_duplicate(self, slot: FrameSlot) -> bool:
+        """Check if a slot holds the same bytes as the last write and the keep-alive is not due yet"""
+        if slot.checksum is None or slot.checksum != self._last_checksum:
+            return False
+        return time.monotonic() - self._last_sent < self.keep_alive
+
+    async def _transmit_loop(self, loop: asyncio.AbstractEventLoop, executor: Executor):
+        while True:
+            slot = await self.transmit_queue.get()
+            try:
+                if self._is_duplicate(slot):
+                    self.duplicate_frames += 1
+                    self.duplicate_bytes += len(slot.packetizer.buffer)
+                else:
+                    # Forget the last write first, a failed write must not mark the frame as sent
+                    self._last_checksum = None
+                    await loop.run_in_executor(executor, self._transmit, slot)
+                    self._last_checksum = slot.checksum
+                    self._last_sent = time.monotonic()
+                    self.frames_sent += 1
+            finally:
+                self.free_slots.put_nowait(slot)
+
+    async def run(self, image_executor: Executor, io_executor: Executor):
+        """
+        Run the stages until one of them fails or the task is cancelled
+
+        Args:
+            image_executor: Executor for rendering and encoding
+            io_executor: Executor for device writes, ideally with a single worker per panel
+        """
+        loop = asyncio.get_running_loop()
+        self.render_queue = asyncio.Queue(maxsize=self.render_queue_size)
+        self.transmit_queue = asyncio.Queue(maxsize=self.transmit_queue_size)
+        # One slot per queued frame, plus the one being encoded and the one being sent
+        self.free_slots = asyncio.Queue()
+        for _ in range(self.transmit_queue_size + 2):
+            self.free_slots.put_nowait(self._slot_factory())
+
+        tasks = [
+            asyncio.ensure_future(self._render_loop(loop, image_executor)),
+            asyncio.ensure_future(self._encode_loop(loop, image_executor)),
+            asyncio.ensure_future(self._transmit_loop(loop, io_executor))
+        ]
+        self.logger.debug(f"Frame pipeline '{self.name}' started")
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Get the number of frames waiting in front of each stage"""
+        if self.render_queue is None:
+            return {'encode': 0, 'transmit': 0, 'free_slots': 0}
+        return {
+            'encode': self.render_queue.qsize(),
+            'transmit': self.transmit_queue.qsize(),
+            'free_slots': self.free_slots.qsize()
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pacing statistics and queue depths"""
+        return {
+            **self.scheduler.get_stats(),
+            'frames_sent': self.frames_sent,
+            'suppressed_frames': self.suppressed_frames,
+            'duplicate_frames': self.duplicate_frames,
+            'duplicate_bytes': self.duplicate_bytes,
+            'queue_depths': self.get_queue_depths()
+        }
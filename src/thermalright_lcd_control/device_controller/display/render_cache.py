@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image
+
+from .config_loader import ConfigLoader
+from .generator import DisplayGenerator
+from ...common.logging_config import LoggerConfig
+
+
+class RenderCache:
+    """
+    Display generator shared by every panel showing the same theme at the same geometry
+
+    The generator is rebuilt by reload_if_changed() when its configuration file
+    changes. A rendered frame is handed to every panel that asks for one within
+    the first half of that frame's duration, so panels sharing a theme render
+    each frame once.
+    """
+
+    def __init__(self, config_file: str, width: int, height: int):
+        self.config_file = config_file
+        self.width = width
+        self.height = height
+        self.logger = LoggerConfig.setup_service_logger()
+        self.last_modified = pathlib.Path(config_file).stat().st_mtime_ns
+        self._lock = threading.Lock()
+        self._generator: Optional[DisplayGenerator] = None
+        self._frame: Optional[Tuple[Image.Image, float]] = None
+        self._frame_expiry = 0.0
+
+    def _build_generator(self) -> DisplayGenerator:
+        config_loader = ConfigLoader()
+        config = config_loader.load_config(self.config_file)
+        config.output_width = self.width
+        config.output_height = self.height
+        return DisplayGenerator(config)
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild the generator if the configuration file changed since it was loaded"""
+        last_modified = pathlib.Path(self.config_file).stat().st_mtime_ns
+        if last_modified <= self.last_modified:
+            return False
+
+        self.logger.info(f"Config file updated: {self.config_file}")
+        # Remember the new version first so a broken file is reported once, not on every check
+        self.last_modified = last_modified
+        generator = self._build_generator()
+        with self._lock:
+            previous, self._generator = self._generator, generator
+            self._frame = None
+        if previous is not None:
+            previous.cleanup()
+        self.logger.info(f"Display generator reloaded from {self.config_file}")
+        return True
+
+    def get_frame_with_duration(self) -> Tuple[Image.Image, float]:
+        """Get the current frame, rendering it only if no panel did so for this frame slot"""
+        with self._lock:
+            if self._generator is None:
+                self.logger.info(f"No generator found, loading from {self.config_file}")
+                self._generator = self._build_generator()
+
+            now = time.monotonic()
+            if self._frame is None or now >= self._frame_expiry:
+                self._frame = self._generator.get_frame_with_duration()
+                self._frame_expiry = now + self._frame[1] / 2
+            return self._frame
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the rendering counters of the current generator"""
+        with self._lock:
+            generator = self._generator
+        if generator is None:
+            return {}
+        return generator.get_stats()
+
+
+_render_caches: Dict[Tuple[str, int, int], RenderCache] = {}
+_render_caches_lock = threading.Lock()
+
+
+def get_render_cache(config_file: str, width: int, height: int) -> RenderCache:
+    """Get the render cache shared by every panel using this config file and geometry"""
+    key = (os.path.realpath(config_file), width, height)
+    with _render_caches_lock:
+        if key not in _render_caches:
+            _render_caches[key] = RenderCache(config_file, width, height)
+        return _render_caches[key]
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import ImageFont
+
+from .config import DisplayConfig, MetricConfig, TextConfig
+from .text_renderer import TextItem, TextRenderer
+
+# Formats of the date (dd/mm) and time (HH:MM) texts
+DATE_FORMAT = "%d/%m"
+TIME_FORMAT = "%H:%M"
+
+
+class TextStep(NamedTuple):
+    """Text of the render plan, metric is None for the date and time which format the current datetime"""
+    metric: Optional[str]
+    format: Callable[[Any], str]
+    position: Tuple[int, int]
+    font_size: int
+    color: Tuple[int, int, int, int]
+    font: ImageFont.ImageFont
+
+
+class RenderPlan(NamedTuple):
+    """
+    Texts of a display configuration, compiled once into the steps of each frame
+
+    Compiling resolves the fonts and binds each metric to a formatter chosen
+    from its format string, which was checked to format numbers, so
+    executing the plan only looks metric values up and formats them. Values
+    that are not numbers go through TextRenderer.format_metric, which
+    produces the same texts. Steps keep the drawing order: metrics, date then
+    time.
+    """
+    steps: Tuple[TextStep, ...]
+
+    @classmethod
+    def compile(cls, display_config: DisplayConfig, text_renderer: TextRenderer) -> "RenderPlan":
+        steps = []
+        for config in display_config.metrics_configs:
+            if config.enabled:
+                steps.append(TextStep(config.name, _metric_formatter(config, text_renderer),
+                                      config.position, config.font_size, config.color,
+                                      text_renderer.get_font(config.font_size)))
+        for config, pattern in ((display_config.date_config, DATE_FORMAT), (display_config.time_config, TIME_FORMAT)):
+            if config and config.enabled:
+                steps.append(_clock_step(config, pattern, text_renderer))
+        return cls(tuple(steps))
+
+    def execute(self, metrics: Optional[Dict[str, Any]]) -> List[TextItem]:
+        """Get every text of a frame showing the given metrics"""
+        now = datetime.now()
+        metrics = metrics or {}
+        items = []
+        for step in self.steps:
+            value = now if step.metric is None else metrics.get(step.metric)
+            if value is not None:
+                items.append(TextItem(step.position, step.format(value), step.font_size, step.color, step.font))
+        return items
+
+
+def _clock_step(config: TextConfig, pattern: str, text_renderer: TextRenderer) -> TextStep:
+    return TextStep(None, lambda now: now.strftime(pattern), config.position, config.font_size, config.color,
+                    text_renderer.get_font(config.font_size))
+
+
+def _metric_formatter(config: MetricConfig, text_renderer: TextRenderer) -> Callable[[Any], str]:
+    """Get a formatter giving the same texts as TextRenderer.format_metric"""
+    slow_format = partial(text_renderer.format_metric, config=config)
+    # Float formats get the value as a float, other formats get its string
+    if '{value:.0f}' in config.format_string or '{value:.1f}' in config.format_string:
+        convert = float
+    else:
+        convert = str
+    fast_format = partial(config.format_string.format, label=config.format_label(), unit=config.unit)
+    try:
+        fast_format(value=convert(0))
+    except Exception:
+        # Invalid format strings are left to the fallbacks of format_metric
+        return slow_format
+
+    def format_value(value: Any) -> str:
+        if isinstance(value, (int, float)):
+            return fast_format(value=convert(value))
+        return slow_format(value)
+
+    return format_value
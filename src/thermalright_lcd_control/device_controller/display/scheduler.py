@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class FrameScheduler:
+    """
+    Frame pacing against absolute deadlines on a monotonic clock
+
+    Each frame is due one frame duration after the previous deadline, so the
+    time spent rendering, encoding and writing comes out of the frame budget
+    instead of being added to it. When the caller falls a whole frame or more
+    behind, the missed deadlines are skipped rather than played late.
+    """
+
+    FPS_WINDOW = 120  # Number of recent frames used to compute the achieved fps
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._deadline: Optional[float] = None
+        self._frame_times = deque(maxlen=self.FPS_WINDOW)
+
+        self.frames = 0
+        self.skipped_frames = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self._total_lateness = 0.0
+
+    def delay(self) -> float:
+        """Get the time left until the current frame deadline, 0 if it already passed"""
+        if self._deadline is None:
+            self._deadline = self._clock()
+        return max(self._deadline - self._clock(), 0.0)
+
+    def start_frame(self):
+        """Record that the current frame starts now"""
+        now = self._clock()
+        lateness = max(now - self._deadline, 0.0) if self._deadline is not None else 0.0
+        self.frames += 1
+        self.last_lateness = lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self._total_lateness += lateness
+        self._frame_times.append(now)
+
+    def schedule_next(self, duration: float):
+        """Move the deadline one frame ahead, skipping the slots that were already missed"""
+        if self._deadline is None:
+            self._deadline = self._clock()
+
+        self._deadline += duration
+        if duration <= 0:
+            return
+
+        behind = self._clock() - self._deadline
+        if behind >= duration:
+            missed = int(behind // duration)
+            self._deadline += missed * duration
+            self.skipped_frames += missed
+
+    def get_achieved_fps(self) -> float:
+        """Get the frame rate achieved over the recent frames"""
+        if len(self._frame_times) < 2:
+            return 0.0
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        return (len(self._frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pacing statistics"""
+        return {
+            'frames': self.frames,
+            'skipped_frames': self.skipped_frames,
+            'achieved_fps': self.get_achieved_fps(),
+            'last_lateness': self.last_lateness,
+            'max_lateness': self.max_lateness,
+            'mean_lateness': self._total_lateness / self.frames if self.frames else 0.0
+        }
@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright © 2025 Rejeb Ben Rejeb
 
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import string
+from typing import Optional, Dict, Any, NamedTuple, Set, Tuple
 
-from PIL import ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont
 
 from .config import TextConfig, MetricConfig, DisplayConfig
+from .frame_cache import FrameCache
+from .glyph_atlas import GlyphAtlas
 from ...common.logging_config import LoggerConfig
 
 # Import font manager from current package
@@ -23,17 +25,89 @@ except ImportError:
         return FallbackFontManager()
 
 
-class TextRenderer:
-    """Text rendering manager for images with global font support"""
+class TextItem(NamedTuple):
+    """Text drawn at a fixed position, compared to detect content changes"""
+    position: Tuple[int, int]
+    text: str
+    font_size: int
+    color: Tuple[int, int, int, int]
+    # Font already resolved for font_size, looked up when drawing if None
+    font: Optional[ImageFont.ImageFont] = None
+
 
-    def __init__(self, display_config: DisplayConfig):
+class TextRenderer:
+    """
+    Text rendering manager for images with global font support
+
+    Texts are rasterised once into alpha masks, kept in a FrameCache bounded
+    to sprite_cache_bytes, and blitted with their color on later frames, so
+    FreeType only runs when a value shows a string not seen recently. Missing
+    sprites of metric values, dates and times are composed from a GlyphAtlas
+    built per font size when the configuration is loaded, FreeType only
+    rasterises texts with characters outside it.
+    """
+
+    DEFAULT_SPRITE_CACHE_BYTES = 4 * 1024 * 1024
+    # Image.info key of the sprite offset from the text position
+    SPRITE_OFFSET_KEY = 'offset'
+
+    def __init__(self, display_config: DisplayConfig, sprite_cache_bytes: int = DEFAULT_SPRITE_CACHE_BYTES):
         self.logger = LoggerConfig.setup_service_logger()
         self.font_manager = get_font_manager()
         self._font_cache = {}
-
-    def _get_font(self, font_size: int) -> ImageFont.ImageFont:
+        self.sprites = FrameCache(sprite_cache_bytes)
+        self.atlases: Dict[int, GlyphAtlas] = {}
+        self.atlas_renders = 0
+        self.freetype_renders = 0
+        self._build_atlases(display_config)
+
+    def get_font(self, font_size: int) -> ImageFont.ImageFont:
+        """Get the global font at the given size"""
         return self.font_manager.get_font(font_size)
 
+    def _item_font(self, item: TextItem) -> ImageFont.ImageFont:
+        return item.font if item.font is not None else self.get_font(item.font_size)
+
+    def _build_atlases(self, display_config: DisplayConfig):
+        """Pre-rasterise the glyphs of metric values, dates and times for each configured font size"""
+        characters: Dict[int, Set[str]] = {}
+        for config in display_config.metrics_configs:
+            if config.enabled:
+                literals = "".join(text for text, _, _, _ in string.Formatter().parse(config.format_string))
+                characters.setdefault(config.font_size, set()).update(config.format_label() + config.unit + literals)
+        for config in (display_config.date_config, display_config.time_config):
+            if config and config.enabled:
+                characters.setdefault(config.font_size, set())
+
+        for font_size, font_characters in characters.items():
+            font = self.get_font(font_size)
+            # Bitmap fonts have no advances in 1/64 pixels to lay glyphs out with
+            if isinstance(font, ImageFont.FreeTypeFont):
+                self.atlases[font_size] = GlyphAtlas(font, font_characters)
+
+    def _get_sprite(self, item: TextItem) -> Image.Image:
+        """Get the alpha mask of a text item, with its offset from the position in Image.info"""
+        font = self._item_font(item)
+        # Masks do not depend on the color, which is applied when blitting
+        key = (font, item.text)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            atlas = self.atlases.get(item.font_size)
+            composed = atlas.compose(item.text) if atlas is not None else None
+            if composed is not None:
+                mask, offset = composed
+                sprite = Image.fromarray(mask)
+                self.atlas_renders += 1
+            else:
+                left, top, right, bottom = font.getbbox(item.text)
+                sprite = Image.new('L', (max(right - left, 0), max(bottom - top, 0)))
+                ImageDraw.Draw(sprite).text((-left, -top), item.text, fill=255, font=font)
+                offset = (left, top)
+                self.freetype_renders += 1
+            sprite.info[self.SPRITE_OFFSET_KEY] = offset
+            self.sprites.put(key, sprite)
+        return sprite
+
     def _safe_format_value(self, value: Any, format_string: str, metric_name: str) -> str:
         """Safely format a metric value, handling various types and potential errors"""
         if value is None:
@@ -64,94 +138,77 @@ class TextRenderer:
             self.logger.warning(f"Error formatting value {value} for metric {metric_name}: {e}")
             return str(value) if value is not None else "N/A"
 
-    def render_metrics(self, draw: ImageDraw.Draw, metrics: Optional[Dict[str, Any]],
-                       configs: List[MetricConfig]):
-        """Display metrics on the image"""
-        if not metrics or not configs:
-            return
+    def format_metric(self, value: Any, config: MetricConfig) -> str:
+        """Format the text displayed for a metric value"""
+        # Format text safely
+        try:
+            # Use safe formatting for the value
+            formatted_value = self._safe_format_value(value, "{value}", config.name)
 
-        for config in configs:
-            if not config.enabled:
-                continue
-
-            # Get metric value
-            value = metrics.get(config.name)
-            if value is None:
-                continue
-
-            # Format text safely
-            try:
-                # Use safe formatting for the value
-                formatted_value = self._safe_format_value(value, "{value}", config.name)
-
-                # If the format string expects a float formatting and we have a numeric value
-                if '{value:.0f}' in config.format_string or '{value:.1f}' in config.format_string:
-                    try:
-                        # Convert to float for proper formatting
-                        if isinstance(value, str):
-                            numeric_value = float(value)
-                        else:
-                            numeric_value = float(value)
-                        text = config.format_string.format(
-                            label=config.format_label(),
-                            value=numeric_value,
-                            unit=config.unit
-                        )
-                    except (ValueError, TypeError):
-                        # Fallback: replace format with simple string
-                        simple_format = config.format_string.replace('{value:.0f}', '{value}').replace('{value:.1f}',
-                                                                                                       '{value}')
-                        text = simple_format.format(
-                            label=config.label,
-                            value=str(value) if value is not None else "N/A",
-                            unit=config.unit
-                        )
-                else:
-                    # Standard formatting
+            # If the format string expects a float formatting and we have a numeric value
+            if '{value:.0f}' in config.format_string or '{value:.1f}' in config.format_string:
+                try:
+                    # Convert to float for proper formatting
+                    if isinstance(value, str):
+                        numeric_value = float(value)
+                    else:
+                        numeric_value = float(value)
                     text = config.format_string.format(
                         label=config.format_label(),
-                        value=formatted_value,
+                        value=numeric_value,
                         unit=config.unit
                     )
+                except (ValueError, TypeError):
+                    # Fallback: replace format with simple string
+                    simple_format = config.format_string.replace('{value:.0f}', '{value}').replace('{value:.1f}',
+                                                                                                   '{value}')
+                    text = simple_format.format(
+                        label=config.label,
+                        value=str(value) if value is not None else "N/A",
+                        unit=config.unit
+                    )
+            else:
+                # Standard formatting
+                text = config.format_string.format(
+                    label=config.format_label(),
+                    value=formatted_value,
+                    unit=config.unit
+                )
 
-            except Exception as e:
-                self.logger.warning(f"Error formatting metric {config.name}: {e}")
-                # Fallback to simple display
-                text = f"{config.label}: {value if value is not None else 'N/A'}{config.unit}"
-
-            # Get font using global font configuration
-            font = self._get_font(config.font_size)
-
-            # Draw text
-            draw.text(config.position, text, fill=config.color, font=font)
-
-    def render_date(self, draw: ImageDraw.Draw, config: Optional[TextConfig]):
-        """Display current date formatted as dd/mm"""
-        if not config or not config.enabled:
-            return
-
-        # dd/mm format
-        current_date = datetime.now().strftime("%d/%m")
-
-        # Get font using global font configuration
-        font = self._get_font(config.font_size)
-
-        # Draw text
-        draw.text(config.position, current_date, fill=config.color, font=font)
-
-    def render_time(self, draw: ImageDraw.Draw, config: Optional[TextConfig]):
-        """Display current time formatted as HH:MM"""
-        if not config or not config.enabled:
+        except Exception as e:
+            self.logger.warning(f"Error formatting metric {config.name}: {e}")
+            # Fallback to simple display
+            text = f"{config.label}: {value if value is not None else 'N/A'}{config.unit}"
+
+        return text
+
+    def get_item_bbox(self, draw: ImageDraw.Draw, item: TextItem) -> Tuple[int, int, int, int]:
+        """Get the (left, top, right, bottom) box covered by a text item"""
+        if '\n' in item.text:
+            return draw.textbbox(item.position, item.text, font=self._item_font(item))
+        sprite = self._get_sprite(item)
+        left, top = sprite.info[self.SPRITE_OFFSET_KEY]
+        x, y = item.position
+        return x + left, y + top, x + left + sprite.width, y + top + sprite.height
+
+    def draw_item(self, draw: ImageDraw.Draw, item: TextItem):
+        """Draw a text item using the global font configuration"""
+        if '\n' in item.text:
+            # Multiline texts are laid out by Pillow
+            draw.text(item.position, item.text, fill=item.color, font=self._item_font(item))
             return
-
-        # HH:MM format
-        current_time = datetime.now().strftime("%H:%M")
-
-        # Get font using global font configuration
-        font = self._get_font(config.font_size)
-
-        # Draw text
-        draw.text(config.position, current_time, fill=config.color, font=font)
+        sprite = self._get_sprite(item)
+        if sprite.width and sprite.height:
+            left, top = sprite.info[self.SPRITE_OFFSET_KEY]
+            draw.bitmap((item.position[0] + left, item.position[1] + top), sprite, fill=item.color)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sprite cache occupancy, hit/miss counters and how missing sprites were rendered"""
+        return {
+            **self.sprites.get_stats(),
+            'atlas_renders': self.atlas_renders,
+            'freetype_renders': self.freetype_renders
+        }
 
     def render_custom_text(self, draw: ImageDraw.Draw, config: TextConfig):
         """Display custom text"""
@@ -159,7 +216,7 @@ class TextRenderer:
             return
 
         # Get font using global font configuration
-        font = self._get_font(config.font_size)
+        font = self.get_font(config.font_size)
 
         # Draw text
         draw.text(config.position, config.text, fill=config.color, font=font)
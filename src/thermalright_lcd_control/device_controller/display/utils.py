@@ -1,26 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright © 2025 Rejeb Ben Rejeb
 import subprocess
-import threading
-from functools import wraps
-
-
-def async_background(daemon=True):
-    """
-    Simple decorator using threading (built-in)
-    """
-
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-            thread.daemon = daemon
-            thread.start()
-            return thread
-
-        return wrapper
-
-    return decorator
 
 
 def _get_default_font_path():
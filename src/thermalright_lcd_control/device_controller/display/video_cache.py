@@ -0,0 +1,157 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from ...common.cache_dir import evict_lru, get_cache_dir, touch
+
+
+class MappedVideo:
+    """Video frames at device resolution, served from a memory-mapped cache file"""
+
+    MAGIC = b'TLVC'
+    VERSION = 1
+    # magic, version, width, height, frame count, fps
+    HEADER = struct.Struct('<4sHHHxxId')
+    HEADER_SIZE = 64  # Frames start on an aligned offset
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        with open(cache_file, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.width, self.height, self.frame_count, self.fps = \
+                self.HEADER.unpack_from(self._mmap, 0)
+            self.frame_size = self.width * self.height * 3
+            if magic != self.MAGIC or version != self.VERSION or self.frame_count == 0:
+                raise ValueError(f"Invalid video cache file: {cache_file}")
+            if len(self._mmap) < self.HEADER_SIZE + self.frame_count * self.frame_size:
+                raise ValueError(f"Truncated video cache file: {cache_file}")
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def get_frame(self, index: int) -> Image.Image:
+        """Get a frame as an RGBA image, index wraps around the end of the video"""
+        offset = self.HEADER_SIZE + (index % self.frame_count) * self.frame_size
+        image = Image.frombuffer('RGB', (self.width, self.height), self._mmap[offset:offset + self.frame_size],
+                                 'raw', 'RGB', 0, 1)
+        return image.convert('RGBA')
+
+    def close(self):
+        self._mmap.close()
+
+
+class VideoCacheWriter:
+    """Cache file being filled with the frames of a first decoding pass"""
+
+    def __init__(self, cache: 'VideoCache', cache_file: Path, width: int, height: int, fps: float):
+        self.cache = cache
+        self.cache_file = cache_file
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = 0
+        self.temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        self._file = open(self.temp_file, 'wb')
+        self._file.write(self._header().ljust(MappedVideo.HEADER_SIZE, b'\0'))
+
+    def _header(self) -> bytes:
+        return MappedVideo.HEADER.pack(MappedVideo.MAGIC, MappedVideo.VERSION,
+                                       self.width, self.height, self.frame_count, self.fps)
+
+    def append(self, frame_rgb: bytes):
+        """Append one RGB888 frame at device resolution"""
+        self._file.write(frame_rgb)
+        self.frame_count += 1
+
+    def commit(self) -> Optional[MappedVideo]:
+        """Publish the cache file and map it, or drop it if nothing was written"""
+        if self.frame_count == 0:
+            self.abort()
+            return None
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+        os.replace(self.temp_file, self.cache_file)
+        self.cache.evict(keep=self.cache_file)
+        return MappedVideo(self.cache_file)
+
+    def abort(self):
+        """Drop the partially written file"""
+        self._file.close()
+        try:
+            self.temp_file.unlink()
+        except OSError:
+            pass
+
+
+class VideoCache:
+    """
+    On-disk cache of videos decoded at device resolution
+
+    A video is decoded once into a raw RGB888 frame file, keyed by source
+    path, modification time, size and target geometry. Later loops and
+    service restarts serve frames from mmap with no decoding nor seeking.
+    The cache is bounded by max_bytes, evicting the least recently used
+    files first.
+    """
+
+    DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+    TEMP_FILE_MAX_AGE = 3600
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = logging.getLogger('thermalright.display.video_cache')
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir('video')
+        self.max_bytes = max_bytes
+
+    def _cache_file(self, video_path: str, width: int, height: int) -> Path:
+        stat = os.stat(video_path)
+        key = f"{os.path.realpath(video_path)}\0{stat.st_mtime_ns}\0{stat.st_size}\0{width}x{height}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.frames"
+
+    def open(self, video_path: str, width: int, height: int) -> Optional[MappedVideo]:
+        """Map the cached frames of a video, None if it is not cached yet"""
+        cache_file = self._cache_file(video_path, width, height)
+        if not cache_file.exists():
+            return None
+        try:
+            mapped = MappedVideo(cache_file)
+        except (ValueError, struct.error) as e:
+            # struct.error: a file shorter than its header
+            self.logger.warning(f"Discarding video cache file {cache_file}: {e}")
+            cache_file.unlink(missing_ok=True)
+            return None
+        except OSError as e:
+            # Not a broken file, such as one this user cannot read: keep it for the others
+            self.logger.warning(f"Cannot read video cache file {cache_file}: {e}")
+            return None
+        # Mark as recently used for eviction
+        touch(cache_file)
+        return mapped
+
+    def create_writer(self, video_path: str, width: int, height: int, fps: float,
+                      frame_count: int) -> Optional[VideoCacheWriter]:
+        """Start caching a video, None if it cannot fit in the cache"""
+        estimated_size = MappedVideo.HEADER_SIZE + frame_count * width * height * 3
+        if estimated_size > self.max_bytes:
+            self.logger.info(f"Video {video_path} is too large to be cached ({estimated_size} bytes)")
+            return None
+        try:
+            return VideoCacheWriter(self, self._cache_file(video_path, width, height), width, height, fps)
+        except OSError as e:
+            self.logger.warning(f"Cannot create video cache file for {video_path}: {e}")
+            return None
+
+    def evict(self, keep: Optional[Path] = None):
+        """Delete least recently used cache files until the cache fits in max_bytes"""
+        for path in evict_lru(self.cache_dir, '.frames', self.max_bytes, keep, self.TEMP_FILE_MAX_AGE):
+            self.logger.debug(f"Evicted video cache file {path}")
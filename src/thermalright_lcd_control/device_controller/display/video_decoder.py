@@ -0,0 +1,215 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import cv2
+from PIL import Image
+
+from .video_cache import MappedVideo, VideoCache, VideoCacheWriter
+
+
+class VideoDecoder:
+    """
+    Video decoded ahead of time on a dedicated thread
+
+    The decoder thread reads, converts and scales frames to the display
+    resolution into a fixed-size ring, looping the video forever. Frames are
+    numbered continuously across loops, so the renderer only asks for the
+    frame matching the current timestamp. Frames whose time has passed are
+    skipped without being converted, and a frame that is not decoded in time
+    is counted as late while the previous one stays on screen.
+
+    With a VideoCache, the first pass stores every scaled frame on disk and
+    the following loops, as well as later runs, read them from mmap instead
+    of decoding the video again.
+    """
+
+    def __init__(self, video_path: str, width: int, height: int, buffer_depth: int = 8,
+                 cache: Optional[VideoCache] = None):
+        self.logger = logging.getLogger('thermalright.display.video_decoder')
+        self.video_path = video_path
+        self.width = width
+        self.height = height
+        self.buffer_depth = max(buffer_depth, 1)
+
+        self.video_capture = None
+        self._writer: Optional[VideoCacheWriter] = None
+        self._mapped: Optional[MappedVideo] = cache.open(video_path, width, height) if cache else None
+        if self._mapped:
+            self.fps = self._mapped.fps
+            self.frame_count = self._mapped.frame_count
+            self.logger.debug(f"Video frames of {video_path} served from {self._mapped.cache_file}")
+        else:
+            self.video_capture = cv2.VideoCapture(video_path)
+            if not self.video_capture.isOpened():
+                raise RuntimeError(
+                    f"Cannot open video: {video_path}. Please check if the file is corrupted or if OpenCV supports this codec.")
+            self.fps = self.video_capture.get(cv2.CAP_PROP_FPS)
+            self.frame_count = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            if cache:
+                self._writer = cache.create_writer(video_path, width, height, self.fps, self.frame_count)
+        self.frame_duration = 1.0 / self.fps if self.fps > 0 else 1.0 / 30  # Fallback 30 FPS
+
+        self._ring: Deque[Tuple[int, Image.Image]] = deque()
+        self._condition = threading.Condition()
+        self._next_decode = 0  # Number of the next frame the decoder produces
+        self._wanted = 0  # Latest frame number requested by the renderer
+        self._current: Optional[Image.Image] = None
+        self._current_number = -1
+        self._late_number = -1
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.decoded_frames = 0
+        self.dropped_frames = 0
+        self.late_frames = 0
+
+    def start(self):
+        """Start the decoder thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._decode_loop, name="video-decoder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the decoder thread and release the video"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self._release()
+
+    def _release(self):
+        if self._writer:
+            self._writer.abort()
+            self._writer = None
+        if self.video_capture:
+            self.video_capture.release()
+        if self._mapped:
+            self._mapped.close()
+
+    def _finish_cache(self) -> bool:
+        """Publish the frames of the first pass and switch to the mapped cache file"""
+        writer, self._writer = self._writer, None
+        try:
+            self._mapped = writer.commit()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Cannot store video cache for {self.video_path}: {e}")
+            writer.abort()
+            return False
+        if self._mapped is None:
+            return False
+        self.frame_count = self._mapped.frame_count
+        self.video_capture.release()
+        self.video_capture = None
+        self.logger.debug(f"Video {self.video_path} cached in {self._mapped.cache_file}")
+        return True
+
+    def _read(self, decode: bool):
+        """Read the next frame, looping at the end of the video; None if the video has no frame"""
+        for _ in range(2):
+            if decode:
+                ret, frame = self.video_capture.read()
+            else:
+                ret, frame = self.video_capture.grab(), None
+            if ret:
+                return frame if decode else True
+            if self._writer and self._finish_cache():
+                return None
+            # Restart video from beginning
+            self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return None
+
+    def _convert(self, frame) -> Image.Image:
+        # Convert BGR (OpenCV) to RGB (PIL)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = Image.fromarray(frame_rgb)
+        image = image.resize((self.width, self.height), Image.Resampling.LANCZOS)
+        if self._writer:
+            try:
+                self._writer.append(image.tobytes())
+            except OSError as e:
+                self.logger.warning(f"Cannot write video cache for {self.video_path}: {e}")
+                self._writer.abort()
+                self._writer = None
+        return image.convert('RGBA')
+
+    def _next_frame(self, number: int, skip: bool) -> Optional[Image.Image]:
+        """Produce frame number, or None when it is skipped or cannot be read"""
+        if not self._mapped:
+            frame = self._read(decode=not skip)
+            if frame is not None:
+                return None if skip else self._convert(frame)
+            if not self._mapped:
+                raise RuntimeError(f"No frame could be read from {self.video_path}")
+        return None if skip else self._mapped.get_frame(number)
+
+    def _decode_loop(self):
+        while True:
+            with self._condition:
+                while self._running and len(self._ring) >= self.buffer_depth:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                number = self._next_decode
+                # Every frame of the first pass is needed to fill the cache
+                skip = number < self._wanted and self._writer is None
+
+            try:
+                image = self._next_frame(number, skip)
+            except Exception as e:
+                self.logger.error(f"Error decoding video {self.video_path}, stopping decoder: {e}")
+                return
+
+            with self._condition:
+                self._next_decode = number + 1
+                if skip:
+                    self.dropped_frames += 1
+                else:
+                    self.decoded_frames += 1
+                    self._ring.append((number, image))
+                    self._condition.notify_all()
+
+    def get_frame(self, number: int, timeout: Optional[float] = None) -> Optional[Image.Image]:
+        """
+        Get the frame to show at the given frame number
+
+        Args:
+            number: Frame number since playback started, counted across loops
+            timeout: Time to wait for a frame when nothing was shown yet
+        """
+        with self._condition:
+            self._wanted = max(self._wanted, number)
+            if self._current is None and not self._ring and timeout:
+                self._condition.wait_for(lambda: self._ring or not self._running, timeout)
+
+            # Frames whose slot already passed are discarded
+            while len(self._ring) > 1 and self._ring[1][0] <= number:
+                self._ring.popleft()
+                self.dropped_frames += 1
+
+            if self._ring and self._ring[0][0] <= number:
+                self._current_number, self._current = self._ring.popleft()
+                self._condition.notify_all()
+            elif self._current is not None and self._current_number < number != self._late_number:
+                # Count each frame number that was not decoded in time once
+                self._late_number = number
+                self.late_frames += 1
+
+            return self._current
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get decoder statistics"""
+        with self._condition:
+            return {
+                'buffer_depth': self.buffer_depth,
+                'buffered_frames': len(self._ring),
+                'decoded_frames': self.decoded_frames,
+                'dropped_frames': self.dropped_frames,
+                'late_frames': self.late_frames
+            }
@@ -3,7 +3,7 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NamedTuple, Optional
 
 
 class Metrics(ABC):
@@ -70,3 +70,10 @@ class Metrics(ABC):
             str: Text description of metrics.
         """
         pass
+
+
+class GpuSample(NamedTuple):
+    """Values of one GPU read together, None for the ones that are not available"""
+    temperature: Optional[float]
+    usage_percentage: Optional[float]
+    frequency: Optional[float]
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import glob
+import os
+import re
+import threading
+from typing import List, Optional
+
+from . import GpuSample
+
+AMD_VENDOR_ID = '0x1002'
+
+_CARD_PATTERN = re.compile(r'card\d+$')
+
+
+def _open(path: Optional[str]) -> Optional[int]:
+    if path is None:
+        return None
+    try:
+        return os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+
+
+def _read(fd: Optional[int]) -> Optional[str]:
+    """Read a whole sysfs attribute from the start, None if it cannot be read"""
+    if fd is None:
+        return None
+    try:
+        return os.pread(fd, 4096, 0).decode('ascii', 'replace')
+    except OSError:
+        return None
+
+
+def parse_current_sclk(text: str) -> Optional[float]:
+    """Get the current level of a pp_dpm_sclk table, the line marked with '*', in MHz"""
+    for line in text.splitlines():
+        line = line.strip()
+        if line.endswith('*') and ':' in line:
+            value = line.split(':', 1)[1].rstrip('*').strip().lower().replace('mhz', '')
+            try:
+                return round(float(value), 2)
+            except ValueError:
+                return None
+    return None
+
+
+class AmdCard:
+    """sysfs attributes of one amdgpu card, kept open"""
+
+    def __init__(self, device_dir: str):
+        self.device_dir = device_dir
+        with open(os.path.join(device_dir, 'device'), 'r') as f:
+            self.device_id = f.read().strip()
+        temperatures = sorted(glob.glob(os.path.join(device_dir, 'hwmon', 'hwmon*', 'temp*_input')))
+        self._busy_fd = _open(os.path.join(device_dir, 'gpu_busy_percent'))
+        self._sclk_fd = _open(os.path.join(device_dir, 'pp_dpm_sclk'))
+        # temp1 is the edge temperature, also shown by rocm-smi
+        self._temperature_fd = _open(temperatures[0] if temperatures else None)
+
+    @property
+    def readable(self) -> bool:
+        return any(fd is not None for fd in (self._busy_fd, self._sclk_fd, self._temperature_fd))
+
+    def sample(self) -> GpuSample:
+        temperature = usage = frequency = None
+        text = _read(self._temperature_fd)
+        if text is not None and text.strip().lstrip('-').isdigit():
+            temperature = int(text) / 1000.0
+        text = _read(self._busy_fd)
+        if text is not None and text.strip().isdigit():
+            usage = float(text)
+        text = _read(self._sclk_fd)
+        if text is not None:
+            frequency = parse_current_sclk(text)
+        return GpuSample(temperature, usage, frequency)
+
+    def close(self):
+        for fd in (self._busy_fd, self._sclk_fd, self._temperature_fd):
+            if fd is not None:
+                os.close(fd)
+        self._busy_fd = self._sclk_fd = self._temperature_fd = None
+
+
+class AmdSysfsBackend:
+    """
+    AMD GPU metrics read from the amdgpu sysfs attributes
+
+    The gpu_busy_percent, pp_dpm_sclk and hwmon temp*_input files of every
+    AMD card are resolved and opened once; each sample is a pread of each
+    of them, without starting rocm-smi or globbing sysfs again. The sysfs
+    root can point to a fake tree for testing.
+    """
+
+    SYSFS_ROOT = '/sys'
+
+    def __init__(self, sysfs_root: str = SYSFS_ROOT):
+        """Open the attributes of every AMD card, raising OSError if none is readable"""
+        self._lock = threading.Lock()
+        self.cards: List[AmdCard] = []
+        for vendor_file in sorted(glob.glob(os.path.join(sysfs_root, 'class', 'drm', 'card*', 'device', 'vendor'))):
+            card_dir = os.path.dirname(os.path.dirname(vendor_file))
+            if not _CARD_PATTERN.match(os.path.basename(card_dir)):
+                # Connectors such as card0-DP-1
+                continue
+            try:
+                with open(vendor_file, 'r') as f:
+                    if f.read().strip() != AMD_VENDOR_ID:
+                        continue
+                card = AmdCard(os.path.dirname(vendor_file))
+            except OSError:
+                continue
+            if card.readable:
+                self.cards.append(card)
+            else:
+                card.close()
+        if not self.cards:
+            raise OSError("No readable amdgpu card in sysfs")
+
+    @property
+    def name(self) -> str:
+        return f"AMD GPU (Device ID: {self.cards[0].device_id})"
+
+    def sample(self) -> List[GpuSample]:
+        """Read every field of every AMD card, in card order"""
+        with self._lock:
+            return [card.sample() for card in self.cards]
+
+    def close(self):
+        with self._lock:
+            for card in self.cards:
+                card.close()
+            self.cards = []
+
+
+def open_amd_sysfs(sysfs_root: str = AmdSysfsBackend.SYSFS_ROOT) -> Optional[AmdSysfsBackend]:
+    """Get an AMD sysfs backend, None without readable amdgpu card"""
+    try:
+        return AmdSysfsBackend(sysfs_root)
+    except OSError:
+        return None
@@ -3,10 +3,12 @@
 
 import glob
 import os
+from typing import Optional, Tuple
 
 import psutil
 
 from . import Metrics
+from .cpu_usage import CpuUsageSampler
 from ...common.logging_config import LoggerConfig
 
 
@@ -17,6 +19,12 @@ class CpuMetrics(Metrics):
         self.cpu_usage = 0.0
         self.cpu_temp = 0.0
         self.cpu_freq = 0.0
+        self.per_core_usage: Tuple[float, ...] = ()
+        try:
+            self.usage_sampler: Optional[CpuUsageSampler] = CpuUsageSampler()
+        except OSError as e:
+            self.logger.debug(f"Cannot read {CpuUsageSampler.PROC_STAT}, using psutil for CPU usage: {e}")
+            self.usage_sampler = None
         self.logger.debug("CpuMetrics initialized")
 
     def get_temperature(self):
@@ -69,18 +77,30 @@ class CpuMetrics(Metrics):
 
     def get_usage_percentage(self):
         """
-        Get the processor usage percentage.
+        Get the processor usage percentage since the previous call, without blocking.
         Returns a float between 0.0 and 100.0.
         """
         try:
-            # Use psutil to get average CPU usage
-            self.cpu_usage = psutil.cpu_percent(interval=1)
+            if self.usage_sampler is not None:
+                usage = self.usage_sampler.sample()
+                self.cpu_usage = usage.overall
+                self.per_core_usage = usage.per_core
+            else:
+                # Non-blocking psutil sampling, also relative to the previous call
+                self.cpu_usage = psutil.cpu_percent(interval=None)
+                self.per_core_usage = tuple(psutil.cpu_percent(interval=None, percpu=True))
             self.logger.debug(f"CPU usage: {self.cpu_usage}%")
             return self.cpu_usage
         except Exception as e:
             self.logger.error(f"Error reading CPU usage: {e}")
             return 0.0
 
+    def get_per_core_usage(self) -> Tuple[float, ...]:
+        """
+        Get the usage percentage of each core, measured by the last get_usage_percentage() call.
+        """
+        return self.per_core_usage
+
     def get_frequency(self):
         """
         Get the current processor frequency in MHz.
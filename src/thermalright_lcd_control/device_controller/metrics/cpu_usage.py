@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# user, nice, system, idle, iowait, irq, softirq and steal; guest time is already counted in user and nice
+_TIME_FIELDS = 8
+_IDLE_FIELDS = (3, 4)
+
+Jiffies = Tuple[int, int]
+
+
+class CpuUsage(NamedTuple):
+    """CPU utilisation in percent, overall and for each core"""
+    overall: float
+    per_core: Tuple[float, ...]
+
+
+def _percent(previous: Optional[Jiffies], current: Jiffies) -> float:
+    """Busy share between two (busy, total) samples, rounded like psutil.cpu_percent"""
+    busy, total = current
+    if previous is not None:
+        busy -= previous[0]
+        total -= previous[1]
+    if total <= 0:
+        return 0.0
+    return round(min(max(busy / total * 100.0, 0.0), 100.0), 1)
+
+
+class CpuUsageSampler:
+    """
+    CPU utilisation from the deltas of /proc/stat jiffies between two samples
+
+    Each sample is a single pread of /proc/stat through a descriptor kept
+    open, compared with the counters of the previous sample, so sampling
+    never sleeps. The first sample covers the time since boot. A sample
+    requested less than MIN_INTERVAL after the previous one returns it
+    again, so consumers polling together do not measure empty deltas.
+    """
+
+    PROC_STAT = '/proc/stat'
+    MIN_INTERVAL = 0.5
+
+    def __init__(self, path: str = PROC_STAT):
+        self._fd = os.open(path, os.O_RDONLY)
+        self._read_size = 16384
+        self._previous: Dict[bytes, Jiffies] = {}
+        self._last: Optional[CpuUsage] = None
+        self._last_time = 0.0
+        self._lock = threading.Lock()
+
+    def _read(self) -> bytes:
+        while True:
+            data = os.pread(self._fd, self._read_size, 0)
+            if len(data) < self._read_size:
+                return data
+            self._read_size *= 2
+
+    def _read_jiffies(self) -> Dict[bytes, Jiffies]:
+        jiffies = {}
+        for line in self._read().splitlines():
+            if not line.startswith(b'cpu'):
+                # CPU lines come first
+                break
+            fields = line.split()
+            times = [int(value) for value in fields[1:_TIME_FIELDS + 1]]
+            total = sum(times)
+            jiffies[fields[0]] = (total - sum(times[i] for i in _IDLE_FIELDS if i < len(times)), total)
+        return jiffies
+
+    def sample(self) -> CpuUsage:
+        """Get the utilisation since the previous sample"""
+        with self._lock:
+            now = time.monotonic()
+            if self._last is not None and now - self._last_time < self.MIN_INTERVAL:
+                return self._last
+
+            jiffies = self._read_jiffies()
+            previous = self._previous
+            overall = _percent(previous.get(b'cpu'), jiffies.get(b'cpu', (0, 0)))
+            per_core = tuple(_percent(previous.get(name), times)
+                             for name, times in jiffies.items() if name != b'cpu')
+            self._previous = jiffies
+            self._last = CpuUsage(overall, per_core)
+            self._last_time = now
+            return self._last
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.close()
@@ -5,8 +5,12 @@ import glob
 import json
 import os
 import subprocess
+from typing import Optional
 
-from . import Metrics
+from . import GpuSample, Metrics
+from .amd_sysfs import open_amd_sysfs
+from .nvidia_smi import open_nvidia_smi
+from .nvml import open_nvml
 from ...common.logging_config import LoggerConfig
 
 
@@ -19,6 +23,8 @@ class GpuMetrics(Metrics):
         self.gpu_freq = None
         self.gpu_vendor = None
         self.gpu_name = None
+        # Reads every value of the GPU in one query, for vendors that have one
+        self.backend = None
 
         self.logger.debug("GpuMetrics initialized")
         self._detect_gpu()
@@ -27,14 +33,16 @@ class GpuMetrics(Metrics):
         """Detect GPU vendor and model"""
         try:
             # Try to detect NVIDIA GPU
-            if self._is_nvidia_available():
+            self.backend = self._open_nvidia_backend()
+            if self.backend is not None:
                 self.gpu_vendor = "nvidia"
-                self.gpu_name = self._get_nvidia_name()
+                self.gpu_name = self.backend.name
                 self.logger.info(f"NVIDIA GPU detected: {self.gpu_name}")
                 return
 
-            # Try to detect AMD GPU
-            if self._is_amd_available():
+            # Try to detect AMD GPU, read from sysfs unless only rocm-smi can read it
+            self.backend = open_amd_sysfs()
+            if self.backend is not None or self._is_amd_available():
                 self.gpu_vendor = "amd"
                 self.gpu_name = self._get_amd_name()
                 self.logger.info(f"AMD GPU detected: {self.gpu_name}")
@@ -52,14 +60,30 @@ class GpuMetrics(Metrics):
         except Exception as e:
             self.logger.error(f"Error detecting GPU: {e}")
 
-    def _is_nvidia_available(self):
-        """Check if NVIDIA GPU and nvidia-smi are available"""
+    def _open_nvidia_backend(self):
+        """Open NVML, or nvidia-smi if NVML cannot be loaded, None without NVIDIA GPU"""
+        backend = open_nvml()
+        if backend is not None:
+            self.logger.debug("Reading NVIDIA GPU metrics from NVML")
+            return backend
+        backend = open_nvidia_smi()
+        if backend is not None:
+            self.logger.debug("NVML not available, streaming NVIDIA GPU metrics from nvidia-smi")
+        return backend
+
+    def _sample_backend(self) -> Optional[GpuSample]:
+        """Read every value of the first GPU in one query"""
         try:
-            result = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader,nounits'],
-                                    capture_output=True, text=True, timeout=5)
-            return result.returncode == 0 and result.stdout.strip()
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return False
+            samples = self.backend.sample()
+        except OSError as e:
+            self.logger.debug(f"Could not read {self.gpu_vendor} GPU metrics: {e}")
+            return None
+        if not samples:
+            return None
+        sample = samples[0]
+        self.gpu_temp, self.gpu_usage, self.gpu_freq = sample
+        self.logger.debug(f"{self.gpu_vendor} GPU sample: {sample}")
+        return sample
 
     def _is_amd_available(self):
         """Check if AMD GPU is available"""
@@ -107,17 +131,6 @@ class GpuMetrics(Metrics):
 
         return False
 
-    def _get_nvidia_name(self):
-        """Get NVIDIA GPU name"""
-        try:
-            result = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader,nounits'],
-                                    capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                return result.stdout.strip().split('\n')[0]
-        except Exception as e:
-            self.logger.debug(f"Could not get NVIDIA GPU name: {e}")
-        return "NVIDIA GPU"
-
     def _get_amd_name(self):
         """Get AMD GPU name"""
         try:
@@ -158,8 +171,9 @@ class GpuMetrics(Metrics):
     def get_temperature(self):
         """Get GPU temperature in Celsius"""
         try:
-            if self.gpu_vendor == "nvidia":
-                return self._get_nvidia_temperature()
+            if self.backend is not None:
+                sample = self._sample_backend()
+                return sample.temperature if sample is not None else None
             elif self.gpu_vendor == "amd":
                 return self._get_amd_temperature()
             elif self.gpu_vendor == "intel":
@@ -171,20 +185,6 @@ class GpuMetrics(Metrics):
             self.logger.error(f"Error reading GPU temperature: {e}")
             return None
 
-    def _get_nvidia_temperature(self):
-        """Get NVIDIA GPU temperature"""
-        try:
-            result = subprocess.run(['nvidia-smi', '--query-gpu=temperature.gpu', '--format=csv,noheader,nounits'],
-                                    capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                temp_str = result.stdout.strip().split('\n')[0]
-                self.gpu_temp = float(temp_str)
-                self.logger.debug(f"NVIDIA GPU temperature: {self.gpu_temp}°C")
-                return self.gpu_temp
-        except Exception as e:
-            self.logger.debug(f"Could not read NVIDIA temperature: {e}")
-        return None
-
     def _get_amd_temperature(self):
         """Get AMD GPU temperature"""
         try:
@@ -247,8 +247,9 @@ class GpuMetrics(Metrics):
     def get_usage_percentage(self):
         """Get GPU usage percentage"""
         try:
-            if self.gpu_vendor == "nvidia":
-                return self._get_nvidia_usage()
+            if self.backend is not None:
+                sample = self._sample_backend()
+                return sample.usage_percentage if sample is not None else None
             elif self.gpu_vendor == "amd":
                 return self._get_amd_usage()
             elif self.gpu_vendor == "intel":
@@ -260,20 +261,6 @@ class GpuMetrics(Metrics):
             self.logger.error(f"Error reading GPU usage: {e}")
             return None
 
-    def _get_nvidia_usage(self):
-        """Get NVIDIA GPU usage percentage"""
-        try:
-            result = subprocess.run(['nvidia-smi', '--query-gpu=utilization.gpu', '--format=csv,noheader,nounits'],
-                                    capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                usage_str = result.stdout.strip().split('\n')[0]
-                self.gpu_usage = float(usage_str)
-                self.logger.debug(f"NVIDIA GPU usage: {self.gpu_usage}%")
-                return self.gpu_usage
-        except Exception as e:
-            self.logger.debug(f"Could not read NVIDIA usage: {e}")
-        return None
-
     def _get_amd_usage(self):
         """Get AMD GPU usage percentage"""
         try:
@@ -323,8 +310,9 @@ class GpuMetrics(Metrics):
     def get_frequency(self):
         """Get GPU frequency in MHz"""
         try:
-            if self.gpu_vendor == "nvidia":
-                return self._get_nvidia_frequency()
+            if self.backend is not None:
+                sample = self._sample_backend()
+                return sample.frequency if sample is not None else None
             elif self.gpu_vendor == "amd":
                 return self._get_amd_frequency()
             elif self.gpu_vendor == "intel":
@@ -336,21 +324,6 @@ class GpuMetrics(Metrics):
             self.logger.error(f"Error reading GPU frequency: {e}")
             return None
 
-    def _get_nvidia_frequency(self):
-        """Get NVIDIA GPU frequency"""
-        try:
-            result = subprocess.run(
-                ['nvidia-smi', '--query-gpu=clocks.current.graphics', '--format=csv,noheader,nounits'],
-                capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                freq_str = result.stdout.strip().split('\n')[0]
-                self.gpu_freq = round(float(freq_str), 2)
-                self.logger.debug(f"NVIDIA GPU frequency: {self.gpu_freq} MHz")
-                return self.gpu_freq
-        except Exception as e:
-            self.logger.debug(f"Could not read NVIDIA frequency: {e}")
-        return None
-
     def _get_amd_frequency(self):
         """Get AMD GPU frequency"""
         try:
@@ -402,12 +375,17 @@ class GpuMetrics(Metrics):
                 'frequency': None
             }
 
+        if self.backend is not None:
+            # One query for every value
+            sample = self._sample_backend() or GpuSample(None, None, None)
+        else:
+            sample = GpuSample(self.get_temperature(), self.get_usage_percentage(), self.get_frequency())
         metrics = {
             'vendor': self.gpu_vendor,
             'name': self.gpu_name,
-            'temperature': self.get_temperature(),
-            'usage_percentage': self.get_usage_percentage(),
-            'frequency': self.get_frequency()
+            'temperature': sample.temperature,
+            'usage_percentage': sample.usage_percentage,
+            'frequency': sample.frequency
         }
 
         # Log summary of collected metrics
@@ -420,6 +398,11 @@ class GpuMetrics(Metrics):
 
         return metrics
 
+    def close(self):
+        """Release the GPU backend, stopping its helper process if any"""
+        if self.backend is not None:
+            self.backend.close()
+
     def get_metric_value(self, metric_name) -> str:
         if metric_name == "gpu_temperature":
             temperature = self.get_temperature()
@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import subprocess
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from . import GpuSample
+from ...common.logging_config import LoggerConfig
+
+# Fields of every query, in the order of the CSV columns
+QUERY_FIELDS = ('name', 'temperature.gpu', 'utilization.gpu', 'clocks.current.graphics')
+
+
+def _parse_value(text: str) -> Optional[float]:
+    """Parse a CSV value, None for [N/A], [Not Supported] and the like"""
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_query_line(line: str) -> Optional[Tuple[str, GpuSample]]:
+    """Parse one GPU line of a QUERY_FIELDS query into its name and sample"""
+    # Names come first and may contain commas
+    values = [value.strip() for value in line.rsplit(',', len(QUERY_FIELDS) - 1)]
+    if len(values) != len(QUERY_FIELDS):
+        return None
+    frequency = _parse_value(values[3])
+    return values[0], GpuSample(_parse_value(values[1]), _parse_value(values[2]),
+                                round(frequency, 2) if frequency is not None else None)
+
+
+class NvidiaSmiBackend:
+    """
+    NVIDIA GPU metrics read from nvidia-smi when NVML cannot be loaded
+
+    Each sample runs a single nvidia-smi query for every field of every GPU,
+    rather than one process per value. The executable can point to a fake
+    script for testing.
+    """
+
+    EXECUTABLE = 'nvidia-smi'
+    TIMEOUT = 5
+
+    def __init__(self, executable: str = EXECUTABLE):
+        """Run a first query, raising OSError if nvidia-smi is not usable"""
+        self.executable = executable
+        self.names: List[str] = []
+        self._latest = self._query()
+        if not self.names:
+            raise OSError("nvidia-smi found no GPU")
+
+    @property
+    def name(self) -> str:
+        return self.names[0]
+
+    def query_command(self) -> List[str]:
+        return [self.executable, f"--query-gpu={','.join(QUERY_FIELDS)}", '--format=csv,noheader,nounits']
+
+    def _query(self) -> List[GpuSample]:
+        try:
+            result = subprocess.run(self.query_command(), capture_output=True, text=True, timeout=self.TIMEOUT)
+        except subprocess.SubprocessError as e:
+            raise OSError(f"nvidia-smi failed: {e}") from e
+        if result.returncode != 0:
+            raise OSError(f"nvidia-smi failed with status {result.returncode}")
+
+        names = []
+        samples = []
+        for line in result.stdout.splitlines():
+            parsed = parse_query_line(line)
+            if parsed is not None:
+                names.append(parsed[0])
+                samples.append(parsed[1])
+        self.names = names
+        return samples
+
+    def sample(self) -> List[GpuSample]:
+        """Read every field of every GPU, in device index order"""
+        self._latest = self._query()
+        return self._latest
+
+    def close(self):
+        pass
+
+
+class NvidiaSmiStream(NvidiaSmiBackend):
+    """
+    NVIDIA GPU metrics streamed by one long-lived nvidia-smi process
+
+    After a first query for detection, nvidia-smi is started once with -lms
+    and prints a line per GPU every interval. A reader thread parses them
+    and sample() serves the latest values without starting any process. The
+    child is restarted with a growing delay when it exits, and killed for a
+    restart when it prints nothing for STALL_TIMEOUT seconds; meanwhile
+    samples read as unavailable rather than frozen.
+    """
+
+    STALL_TIMEOUT = 10.0
+    RESTART_DELAY = 1.0
+    MAX_RESTART_DELAY = 30.0
+
+    def __init__(self, executable: str = NvidiaSmiBackend.EXECUTABLE, interval: float = 1.0):
+        super().__init__(executable)
+        self.logger = LoggerConfig.setup_service_logger()
+        self.interval = interval
+        self.restarts = 0
+        self._updated = time.monotonic()
+        self._process: Optional[subprocess.Popen] = None
+        self._process_started = self._updated
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="nvidia-smi-reader", daemon=True)
+        self._thread.start()
+
+    def stream_command(self) -> List[str]:
+        return [self.executable, f"--query-gpu=index,{','.join(QUERY_FIELDS)}", '--format=csv,noheader,nounits',
+                '-lms', str(max(int(self.interval * 1000), 1))]
+
+    def _read_line(self, line: str):
+        index, _, fields = line.partition(',')
+        parsed = parse_query_line(fields)
+        if parsed is None or not index.strip().isdigit():
+            return
+        index = int(index)
+        with self._lock:
+            while len(self._latest) <= index:
+                self._latest.append(GpuSample(None, None, None))
+            self._latest[index] = parsed[1]
+            self._updated = time.monotonic()
+
+    def _run(self):
+        """Run nvidia-smi and read its lines, restarting it until close()"""
+        delay = self.RESTART_DELAY
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                process = subprocess.Popen(self.stream_command(), stdout=subprocess.PIPE,
+                                           stderr=subprocess.DEVNULL, text=True)
+            except OSError as e:
+                self.logger.warning(f"Cannot start nvidia-smi: {e}")
+            else:
+                with self._lock:
+                    self._process = process
+                    self._process_started = time.monotonic()
+                if self._stop_event.is_set():
+                    # close() ran before the child was stored and could not kill it
+                    process.kill()
+                for line in process.stdout:
+                    self._read_line(line)
+                process.stdout.close()
+                status = process.wait()
+                if self._stop_event.is_set():
+                    break
+                # A child that ran for a while crashed once, it is not failing to start
+                if time.monotonic() - started > self.MAX_RESTART_DELAY:
+                    delay = self.RESTART_DELAY
+                self.logger.warning(f"nvidia-smi exited with status {status}, restarting in {delay:.0f}s")
+
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.MAX_RESTART_DELAY)
+            self.restarts += 1
+
+    def sample(self) -> List[GpuSample]:
+        """Get the latest values of every GPU, in device index order"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._updated <= self.STALL_TIMEOUT:
+                return list(self._latest)
+            # A child started after the stall gets STALL_TIMEOUT to print its first lines
+            process = self._process if now - self._process_started > self.STALL_TIMEOUT else None
+        if process is not None and process.poll() is None:
+            # The reader restarts a stalled child once it is gone
+            process.kill()
+        return []
+
+    def close(self):
+        self._stop_event.set()
+        with self._lock:
+            process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+
+def open_nvidia_smi(executable: str = NvidiaSmiBackend.EXECUTABLE,
+                    stream: bool = True) -> Optional[NvidiaSmiBackend]:
+    """
+    Get an nvidia-smi backend, None if nvidia-smi is missing or has no GPU
+
+    Args:
+        executable: nvidia-smi executable
+        stream: Stream values from a long-lived nvidia-smi instead of running a query per sample
+    """
+    try:
+        return NvidiaSmiStream(executable) if stream else NvidiaSmiBackend(executable)
+    except OSError:
+        # FileNotFoundError included
+        return None
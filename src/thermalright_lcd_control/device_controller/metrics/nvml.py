@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import ctypes
+import threading
+from typing import List, Optional
+
+from . import GpuSample
+
+NVML_SUCCESS = 0
+NVML_TEMPERATURE_GPU = 0
+NVML_CLOCK_GRAPHICS = 0
+NVML_DEVICE_NAME_BUFFER_SIZE = 96
+
+
+class _NvmlUtilization(ctypes.Structure):
+    _fields_ = [('gpu', ctypes.c_uint), ('memory', ctypes.c_uint)]
+
+
+class NvmlBackend:
+    """
+    NVIDIA GPU metrics read in-process from the NVML library
+
+    libnvidia-ml is loaded through ctypes and initialised once, device
+    handles are looked up once, and each sample reads the temperature,
+    utilisation and graphics clock of every GPU with direct library calls
+    instead of starting nvidia-smi. The library path can point to a stub
+    library for testing.
+    """
+
+    LIBRARY = 'libnvidia-ml.so.1'
+
+    def __init__(self, library: str = LIBRARY):
+        """Load and initialise NVML, raising OSError if it is not usable"""
+        self._lib = ctypes.CDLL(library)
+        self._check(self._lib.nvmlInit_v2(), 'nvmlInit_v2')
+        self._lock = threading.Lock()
+        try:
+            count = ctypes.c_uint()
+            self._check(self._lib.nvmlDeviceGetCount_v2(ctypes.byref(count)), 'nvmlDeviceGetCount_v2')
+            self._handles = []
+            for index in range(count.value):
+                handle = ctypes.c_void_p()
+                self._check(self._lib.nvmlDeviceGetHandleByIndex_v2(index, ctypes.byref(handle)),
+                            'nvmlDeviceGetHandleByIndex_v2')
+                self._handles.append(handle)
+            if not self._handles:
+                raise OSError("NVML found no GPU")
+            self.names = [self._get_name(handle) for handle in self._handles]
+        except OSError:
+            self._lib.nvmlShutdown()
+            raise
+
+        # Output arguments are allocated once and reused by every sample
+        self._temperature = ctypes.c_uint()
+        self._utilization = _NvmlUtilization()
+        self._clock = ctypes.c_uint()
+
+    @staticmethod
+    def _check(status: int, function: str):
+        if status != NVML_SUCCESS:
+            raise OSError(f"{function} failed with NVML error {status}")
+
+    def _get_name(self, handle: ctypes.c_void_p) -> str:
+        buffer = ctypes.create_string_buffer(NVML_DEVICE_NAME_BUFFER_SIZE)
+        if self._lib.nvmlDeviceGetName(handle, buffer, NVML_DEVICE_NAME_BUFFER_SIZE) != NVML_SUCCESS:
+            return "NVIDIA GPU"
+        return buffer.value.decode('utf-8', 'replace')
+
+    @property
+    def name(self) -> str:
+        return self.names[0]
+
+    def _sample_device(self, handle: ctypes.c_void_p) -> GpuSample:
+        lib = self._lib
+        temperature = usage = frequency = None
+        if lib.nvmlDeviceGetTemperature(handle, NVML_TEMPERATURE_GPU,
+                                        ctypes.byref(self._temperature)) == NVML_SUCCESS:
+            temperature = float(self._temperature.value)
+        if lib.nvmlDeviceGetUtilizationRates(handle, ctypes.byref(self._utilization)) == NVML_SUCCESS:
+            usage = float(self._utilization.gpu)
+        if lib.nvmlDeviceGetClockInfo(handle, NVML_CLOCK_GRAPHICS, ctypes.byref(self._clock)) == NVML_SUCCESS:
+            frequency = float(self._clock.value)
+        return GpuSample(temperature, usage, frequency)
+
+    def sample(self) -> List[GpuSample]:
+        """Read every field of every GPU, in device index order"""
+        with self._lock:
+            return [self._sample_device(handle) for handle in self._handles]
+
+    def close(self):
+        with self._lock:
+            if self._handles:
+                self._handles = []
+                self._lib.nvmlShutdown()
+
+
+def open_nvml(library: str = NvmlBackend.LIBRARY) -> Optional[NvmlBackend]:
+    """Get an NVML backend, None if the library is missing or has no GPU"""
+    try:
+        return NvmlBackend(library)
+    except (OSError, AttributeError):
+        # AttributeError: a library without the expected NVML functions
+        return None
@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import threading
+from typing import Any, Dict, Optional
+
+from .cpu_metrics import CpuMetrics
+from .gpu_metrics import GpuMetrics
+from ...common.logging_config import LoggerConfig
+
+
+class MetricsSampler:
+    """
+    CPU and GPU metrics collected once for the whole process
+
+    One sampler is shared by every consumer in the process, so driving several
+    panels does not multiply metric collection or GPU tool spawning. Consumers
+    call acquire() and release(); the thread stops with the last release.
+    An event loop that schedules refresh() itself can disable the thread
+    through background_thread.
+    """
+
+    UPDATE_INTERVAL = 1.0
+    background_thread = True
+
+    _shared: Optional['MetricsSampler'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.logger = LoggerConfig.setup_service_logger()
+        self.cpu_metrics = CpuMetrics()
+        self.gpu_metrics = GpuMetrics()
+        self.metrics_lock = threading.Lock()
+        self.current_metrics: Dict[str, Any] = {}
+        self.users = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def acquire(cls) -> 'MetricsSampler':
+        """Get the shared sampler, starting it for the first user"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            sampler = cls._shared
+            sampler.users += 1
+            if sampler.users == 1:
+                sampler._start()
+            return sampler
+
+    @classmethod
+    def get_shared(cls) -> Optional['MetricsSampler']:
+        """Get the shared sampler if any consumer currently uses it"""
+        with cls._shared_lock:
+            return cls._shared
+
+    def release(self):
+        """Drop one user of the shared sampler, stopping it after the last one"""
+        with self._shared_lock:
+            if self.users == 0:
+                return
+            self.users -= 1
+            if self.users == 0:
+                self._stop()
+                if MetricsSampler._shared is self:
+                    MetricsSampler._shared = None
+
+    def _start(self):
+        """Collect a first sample synchronously, then keep refreshing on a thread"""
+        self.refresh()
+        if not self.background_thread:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._update_loop, name="metrics-sampler", daemon=True)
+        self._thread.start()
+        self.logger.debug("Metrics sampler started")
+
+    def _stop(self):
+        self._stop_event.set()
+        self.gpu_metrics.close()
+        if self._thread is None:
+            return
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self.logger.debug("Metrics sampler stopped")
+
+    def _update_loop(self):
+        """Metrics update loop every second"""
+        while not self._stop_event.wait(self.UPDATE_INTERVAL):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Error updating metrics: {e}")
+
+    def refresh(self):
+        """Collect CPU and GPU metrics and publish them to consumers"""
+        cpu_data = self.cpu_metrics.get_all_metrics()
+        gpu_data = self.gpu_metrics.get_all_metrics()
+        metrics = {
+            # CPU metrics
+            'cpu_temperature': cpu_data.get('temperature'),
+            'cpu_usage': cpu_data.get('usage_percentage'),
+            'cpu_frequency': cpu_data.get('frequency'),
+
+            # GPU metrics
+            'gpu_temperature': gpu_data.get('temperature'),
+            'gpu_usage': gpu_data.get('usage_percentage'),
+            'gpu_frequency': gpu_data.get('frequency'),
+            'gpu_vendor': gpu_data.get('vendor'),
+            'gpu_name': gpu_data.get('name')
+        }
+        with self.metrics_lock:
+            self.current_metrics = metrics
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get the latest metrics in a thread-safe manner"""
+        with self.metrics_lock:
+            return self.current_metrics.copy()
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .metrics.sampler import MetricsSampler
+from ..common.logging_config import LoggerConfig
+
+
+class DeviceRuntime:
+    """
+    asyncio event loop driving every panel of the service
+
+    The loop schedules frame deadlines, configuration reloads and metric
+    refreshes. Blocking work never runs on it: image rendering and encoding
+    go to one bounded executor shared by all panels, and each panel gets a
+    single-worker executor for its HID/USB writes so a slow panel cannot
+    stall the others. Metric refreshes, which may wait seconds on a GPU tool,
+    get their own single-worker executor so they never hold a rendering
+    worker. The number of threads is therefore fixed by the number of panels
+    and max_workers.
+    """
+
+    CONFIG_CHECK_INTERVAL = 1.0
+    STATS_LOG_INTERVAL = 60.0
+
+    def __init__(self, devices: List, max_workers: Optional[int] = None):
+        self.logger = LoggerConfig.setup_service_logger()
+        self.devices = devices
+        self.max_workers = max_workers or max(2, min(len(devices) + 1, os.cpu_count() or 1, 4))
+        self.render_caches = list({id(device.render_cache): device.render_cache for device in devices}.values())
+        self.image_executor: Optional[ThreadPoolExecutor] = None
+        self.metrics_executor: Optional[ThreadPoolExecutor] = None
+        # Metrics are refreshed by the event loop instead of a dedicated thread
+        MetricsSampler.background_thread = False
+
+    async def _watch_config(self, loop: asyncio.AbstractEventLoop):
+        """Reload the generators whose configuration file changed"""
+        while True:
+            await asyncio.sleep(self.CONFIG_CHECK_INTERVAL)
+            for render_cache in self.render_caches:
+                try:
+                    await loop.run_in_executor(self.image_executor, render_cache.reload_if_changed)
+                except Exception as e:
+                    self.logger.error(f"Cannot reload {render_cache.config_file}: {e}")
+
+    async def _refresh_metrics(self, loop: asyncio.AbstractEventLoop):
+        """Refresh the shared metrics sampler every UPDATE_INTERVAL"""
+        while True:
+            await asyncio.sleep(MetricsSampler.UPDATE_INTERVAL)
+            sampler = MetricsSampler.get_shared()
+            if sampler is None:
+                continue
+            try:
+                await loop.run_in_executor(self.metrics_executor, sampler.refresh)
+            except Exception as e:
+                self.logger.error(f"Error updating metrics: {e}")
+
+    async def _log_stats(self):
+        while True:
+            await asyncio.sleep(self.STATS_LOG_INTERVAL)
+            for device in self.devices:
+                if device.pipeline is None:
+                    continue
+                self.logger.debug(f"Frame pipeline '{device.name}' stats: {device.pipeline.get_stats()}, "
+                                  f"encoder: {device.encoder.get_stats()}")
+            for render_cache in self.render_caches:
+                self.logger.debug(f"Render stats for {render_cache.config_file}: {render_cache.get_stats()}")
+
+    async def _run_device(self, loop: asyncio.AbstractEventLoop, device, io_executor: ThreadPoolExecutor):
+        await loop.run_in_executor(io_executor, device.reset)
+        await device.create_pipeline().run(self.image_executor, io_executor)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self.image_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="display-worker")
+        self.metrics_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics")
+        io_executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"display-io-{device.name}")
+                        for device in self.devices]
+
+        tasks = [asyncio.ensure_future(self._run_device(loop, device, io_executor))
+                 for device, io_executor in zip(self.devices, io_executors)]
+        tasks += [
+            asyncio.ensure_future(self._watch_config(loop)),
+            asyncio.ensure_future(self._refresh_metrics(loop)),
+            asyncio.ensure_future(self._log_stats())
+        ]
+        self.logger.info(f"Device runtime started for {len(self.devices)} display(s), "
+                         f"{self.max_workers} image worker(s)")
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in [self.image_executor, self.metrics_executor, *io_executors]:
+                executor.shutdown(wait=False)
+
+    def run(self):
+        """Run every panel until one of them fails or the process is interrupted"""
+        asyncio.run(self._run())
+
+
+def run_devices(devices: List, max_workers: Optional[int] = None):
+    """Drive the given panels from a single asyncio event loop"""
+    DeviceRuntime(devices, max_workers).run()
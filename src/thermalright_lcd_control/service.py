@@ -23,13 +23,17 @@ def main():
     parser.add_argument('--config',
                         required=True,
                         help="Display configuration file")
+    parser.add_argument('--keep-alive',
+                        type=float,
+                        default=None,
+                        help="Seconds after which a frame that did not change is sent again, 0 sends every frame")
     args = parser.parse_args()
     from .common.logging_config import get_service_logger
     logger = get_service_logger()
     logger.info("Thermal Right LCD Control starting in device controller mode")
 
     from .device_controller import run_service
-    run_service(args.config)
+    run_service(args.config, args.keep_alive)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+"""
+Stand-in for nvidia-smi printing the CSV of two GPUs
+
+Queries print one line per GPU. With -lms the GPUs are printed with their
+index every interval, the temperature of the first one rising by a degree
+each time, until the process is killed.
+
+FAKE_NVIDIA_SMI_MODE selects the behaviour: 'ok' (default), 'no-gpu' to
+print nothing, 'fail' to exit with status 9, and for -lms only 'crash' to
+exit with status 3 at once or 'hang' to stop printing after two intervals.
+FAKE_NVIDIA_SMI_LOG names a file receiving the start time of every -lms run.
+"""
+
+import os
+import sys
+import time
+
+GPUS = [
+    "NVIDIA GeForce, RTX 3080, 61, 17, 1905.5",
+    "Tesla T4, [N/A], [Not Supported], 585",
+]
+
+
+def stream(interval: float, mode: str):
+    log = os.environ.get('FAKE_NVIDIA_SMI_LOG')
+    if log:
+        with open(log, 'a') as file:
+            file.write(f"{time.monotonic()}\n")
+    if mode == 'crash':
+        sys.exit(3)
+
+    count = 0
+    while True:
+        count += 1
+        print(f"0, NVIDIA GeForce, RTX 3080, {60 + count}, 17, 1905.5", flush=True)
+        print("1, Tesla T4, [N/A], [Not Supported], 585", flush=True)
+        if mode == 'hang' and count == 2:
+            time.sleep(3600)
+        time.sleep(interval)
+
+
+def main():
+    mode = os.environ.get('FAKE_NVIDIA_SMI_MODE', 'ok')
+    if mode == 'fail':
+        sys.exit(9)
+    if '-lms' in sys.argv:
+        stream(int(sys.argv[sys.argv.index('-lms') + 1]) / 1000, mode)
+    elif mode != 'no-gpu':
+        print("\n".join(GPUS))
+
+
+if __name__ == '__main__':
+    main()
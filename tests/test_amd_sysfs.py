@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import pytest
+
+from thermalright_lcd_control.device_controller.metrics import GpuSample
+from thermalright_lcd_control.device_controller.metrics.amd_sysfs import (AmdSysfsBackend, open_amd_sysfs,
+                                                                          parse_current_sclk)
+
+SCLK_TABLE = "0: 500Mhz\n1: 1200Mhz *\n2: 2100Mhz\n"
+
+
+def make_card(sysfs_root, name, vendor, device_id='0x73bf', attributes=None):
+    """Fake /sys/class/drm/<name>/device directory with the given attribute files"""
+    device_dir = sysfs_root / 'class' / 'drm' / name / 'device'
+    device_dir.mkdir(parents=True)
+    (device_dir / 'vendor').write_text(f"{vendor}\n")
+    (device_dir / 'device').write_text(f"{device_id}\n")
+    for path, content in (attributes or {}).items():
+        (device_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (device_dir / path).write_text(content)
+    return device_dir
+
+
+@pytest.fixture
+def sysfs_root(tmp_path):
+    make_card(tmp_path, 'card0', '0x1002', attributes={
+        'gpu_busy_percent': "30\n",
+        'pp_dpm_sclk': SCLK_TABLE,
+        'hwmon/hwmon0/temp1_input': "45000\n",
+        'hwmon/hwmon0/temp2_input': "60000\n",
+    })
+    # Connector of card0, not a card
+    make_card(tmp_path, 'card0-DP-1', '0x1002', attributes={'gpu_busy_percent': "99\n"})
+    make_card(tmp_path, 'card1', '0x10de', attributes={'gpu_busy_percent': "99\n"})
+    return tmp_path
+
+
+@pytest.mark.parametrize('text, expected', [
+    (SCLK_TABLE, 1200.0),
+    ("0: 500Mhz *\n1: 1200Mhz\n", 500.0),
+    ("0: 852.5MHz *\n", 852.5),
+    ("0: 500Mhz\n1: 1200Mhz\n", None),
+    ("1: fastMhz *\n", None),
+    ("", None),
+])
+def test_parse_current_sclk(text, expected):
+    assert parse_current_sclk(text) == expected
+
+
+def test_open_amd_sysfs_without_card(tmp_path):
+    assert open_amd_sysfs(str(tmp_path)) is None
+    make_card(tmp_path, 'card1', '0x10de', attributes={'gpu_busy_percent': "99\n"})
+    assert open_amd_sysfs(str(tmp_path)) is None
+
+
+def test_open_amd_sysfs_without_readable_attribute(tmp_path):
+    make_card(tmp_path, 'card0', '0x1002')
+    assert open_amd_sysfs(str(tmp_path)) is None
+
+
+def test_sample_reads_amd_cards_only(sysfs_root):
+    backend = open_amd_sysfs(str(sysfs_root))
+    assert len(backend.cards) == 1
+    assert backend.name == "AMD GPU (Device ID: 0x73bf)"
+    # temp1 is the edge temperature
+    assert backend.sample() == [GpuSample(45.0, 30.0, 1200.0)]
+    backend.close()
+
+
+def test_sample_rereads_changed_values(sysfs_root):
+    backend = AmdSysfsBackend(str(sysfs_root))
+    assert backend.sample() == [GpuSample(45.0, 30.0, 1200.0)]
+
+    card = sysfs_root / 'class' / 'drm' / 'card0' / 'device'
+    # Rewritten in place, like sysfs attributes read again through the open descriptors
+    (card / 'gpu_busy_percent').write_text("7\n")
+    (card / 'pp_dpm_sclk').write_text("0: 500Mhz\n1: 1200Mhz\n2: 2100Mhz *\n")
+    (card / 'hwmon' / 'hwmon0' / 'temp1_input').write_text("5500\n")
+    assert backend.sample() == [GpuSample(5.5, 7.0, 2100.0)]
+    backend.close()
+
+
+def test_sample_missing_attributes(tmp_path):
+    make_card(tmp_path, 'card0', '0x1002', attributes={'gpu_busy_percent': "12\n"})
+    backend = AmdSysfsBackend(str(tmp_path))
+    assert backend.sample() == [GpuSample(None, 12.0, None)]
+
+
+def test_close(sysfs_root):
+    backend = AmdSysfsBackend(str(sysfs_root))
+    backend.close()
+    assert backend.cards == []
+    assert backend.sample() == []
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import builtins
+import os
+
+import pytest
+from PIL import Image
+
+from thermalright_lcd_control.device_controller.display.asset_cache import AssetCache
+
+SIZE = (8, 6)
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "background.png"
+    Image.new('RGB', (16, 12), (200, 100, 50)).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    return AssetCache(cache_dir)
+
+
+def permission_denied(*args, **kwargs):
+    raise PermissionError(1, "Operation not permitted")
+
+
+def test_load_stores_scaled_image(cache, image_path):
+    image = cache.load(image_path, SIZE)
+    cache_file = cache._cache_file(image_path, SIZE, Image.Resampling.LANCZOS)
+    assert cache_file.exists()
+    cached = cache.load(image_path, SIZE)
+    assert cached.mode == 'RGBA'
+    assert cached.tobytes() == image.tobytes()
+
+
+def test_load_file_of_another_user(cache, image_path, monkeypatch):
+    cache.load(image_path, SIZE)
+    cache_file = cache._cache_file(image_path, SIZE, Image.Resampling.LANCZOS)
+    monkeypatch.setattr(os, 'utime', permission_denied)
+    monkeypatch.setattr(Image, 'open', permission_denied)
+    # Served from the cache without touching nor decoding the source
+    assert cache.load(image_path, SIZE).size == SIZE
+    assert cache_file.exists()
+
+
+def test_load_keeps_unreadable_file(cache, image_path, monkeypatch, caplog):
+    cache.load(image_path, SIZE)
+    cache_file = cache._cache_file(image_path, SIZE, Image.Resampling.LANCZOS)
+    real_open = builtins.open
+
+    def open_cache_denied(file, *args, **kwargs):
+        if str(file) == str(cache_file):
+            permission_denied()
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', open_cache_denied)
+    assert cache.load(image_path, SIZE).size == SIZE
+    assert "Discarding" not in caplog.text
+
+
+@pytest.mark.parametrize('content', [b"", b"TLAC", b"garbage and more garbage"])
+def test_load_discards_invalid_file(cache, image_path, content, caplog):
+    cache_file = cache._cache_file(image_path, SIZE, Image.Resampling.LANCZOS)
+    cache_file.write_bytes(content)
+    assert cache.load(image_path, SIZE).size == SIZE
+    assert "Discarding" in caplog.text
+    # Replaced by a valid entry
+    assert cache_file.read_bytes() != content
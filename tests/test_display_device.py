@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import os
+
+import pytest
+import usb.core
+
+from thermalright_lcd_control.device_controller.display.display_device import find_usb_device, usb_location
+
+
+class FakeUsbDevice:
+    def __init__(self, bus, address, port_numbers, serial_number=None):
+        self.bus = bus
+        self.address = address
+        self.port_numbers = port_numbers
+        self._serial_number = serial_number
+
+    @property
+    def serial_number(self):
+        if self._serial_number is None:
+            raise ValueError("The device has no langid")
+        return self._serial_number
+
+
+@pytest.fixture
+def panels(monkeypatch):
+    """Two identical panels on ports 1-2 and 1-3.1"""
+    devices = [FakeUsbDevice(1, 5, (2,), 'A'), FakeUsbDevice(1, 9, (3, 1), 'B')]
+    monkeypatch.setattr(usb.core, 'find', lambda find_all=False, **kwargs: iter(devices))
+    return devices
+
+
+def make_hidraw(sysfs_root, name: str, interface_dir: str):
+    """Fake /sys/class/hidraw/<name>/device link to a HID device under a USB interface"""
+    hid_dir = os.path.join(sysfs_root, 'devices', 'pci0000:00', 'usb1', interface_dir, '0003:0418:5303.0001')
+    os.makedirs(hid_dir)
+    link_dir = os.path.join(sysfs_root, 'class', 'hidraw', name)
+    os.makedirs(link_dir)
+    os.symlink(hid_dir, os.path.join(link_dir, 'device'))
+
+
+def test_usb_location_of_libusb_paths():
+    assert usb_location(b'1-3.1:1.0') == '1-3.1'
+    assert usb_location(b'0001:0009:00') == (1, 9)
+    assert usb_location(b'unknown') is None
+    assert usb_location(None) is None
+
+
+def test_usb_location_of_hidraw_path(tmp_path):
+    make_hidraw(str(tmp_path), 'hidraw3', os.path.join('1-3', '1-3.1', '1-3.1:1.0'))
+    assert usb_location(b'/dev/hidraw3', sysfs_root=str(tmp_path)) == '1-3.1'
+    assert usb_location(b'/dev/hidraw4', sysfs_root=str(tmp_path)) is None
+
+
+def test_find_usb_device_by_location(panels):
+    assert find_usb_device(0x0418, 0x5303, b'1-2:1.0') is panels[0]
+    assert find_usb_device(0x0418, 0x5303, b'1-3.1:1.0') is panels[1]
+    assert find_usb_device(0x0418, 0x5303, b'0001:0009:00') is panels[1]
+
+
+def test_find_usb_device_by_serial_number(panels):
+    assert find_usb_device(0x0418, 0x5303, b'/dev/hidraw-missing', serial_number='B') is panels[1]
+
+
+def test_find_usb_device_without_match(panels):
+    panels[1]._serial_number = None
+    assert find_usb_device(0x0418, 0x5303, b'unknown', serial_number='B') is None
+    assert find_usb_device(0x0418, 0x5303, b'unknown') is None
+
+
+def test_find_single_usb_device(monkeypatch):
+    device = FakeUsbDevice(1, 5, (2,))
+    monkeypatch.setattr(usb.core, 'find', lambda find_all=False, **kwargs: iter([device]))
+    assert find_usb_device(0x0418, 0x5303) is device
@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from thermalright_lcd_control.device_controller.display.encoder import FrameEncoder, dirty_frame_info
+
+GEOMETRIES = [(320, 320), (480, 480), (320, 240)]
+
+
+def getpixel_encode(img: Image.Image) -> bytearray:
+    """Reference per-pixel encoder the scan table replaced"""
+    width, height = img.size
+    coords = [(x, y) for x in range(width) for y in range(height - 1, -1, -1)]
+    out = bytearray()
+    for i, (x, y) in enumerate(coords, start=1):
+        if i % height == 0:
+            out.extend((0x00, 0x00))
+        else:
+            r, g, b = img.getpixel((x, y))
+            val565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            out.extend((val565 & 0xFF, (val565 >> 8) & 0xFF))
+    return out
+
+
+def random_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    pixels = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return Image.fromarray(pixels, 'RGB')
+
+
+@pytest.mark.parametrize('width, height', GEOMETRIES)
+def test_encode_matches_getpixel(width, height):
+    img = random_image(width, height)
+    assert FrameEncoder(width, height).encode(img) == getpixel_encode(img)
+
+
+@pytest.mark.parametrize('width, height', GEOMETRIES)
+def test_encode_converts_rgba(width, height):
+    img = random_image(width, height, seed=1).convert('RGBA')
+    assert FrameEncoder(width, height).encode(img) == getpixel_encode(img.convert('RGB'))
+
+
+@pytest.mark.parametrize('width, height', GEOMETRIES)
+def test_dirty_encode_matches_getpixel(width, height):
+    encoder = FrameEncoder(width, height)
+    first = random_image(width, height)
+    first.info.update(dirty_frame_info(1))
+    encoder.encode(first)
+
+    second = first.copy()
+    second.paste(random_image(40, 30, seed=2), (10, 20))
+    second.info.update(dirty_frame_info(2, 1, [(10, 20, 50, 50)]))
+    assert encoder.encode(second) == getpixel_encode(second)
+    assert encoder.get_stats()['partial_encodes'] == 1
+
+
+def test_encode_rejects_other_geometry():
+    with pytest.raises(ValueError):
+        FrameEncoder(320, 320).encode(random_image(480, 480))
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+from pathlib import Path
+
+import pytest
+
+from thermalright_lcd_control.device_controller.metrics import GpuSample
+from thermalright_lcd_control.device_controller.metrics.nvidia_smi import (NvidiaSmiBackend, open_nvidia_smi,
+                                                                           parse_query_line)
+from thermalright_lcd_control.device_controller.metrics.nvml import open_nvml
+
+FAKE_NVIDIA_SMI = str(Path(__file__).with_name('fake_nvidia_smi.py'))
+
+
+@pytest.mark.parametrize('line, expected', [
+    ("NVIDIA GeForce RTX 3080, 61, 17, 1905", ("NVIDIA GeForce RTX 3080", GpuSample(61.0, 17.0, 1905.0))),
+    ("NVIDIA GeForce, RTX 3080, 61, 17, 1905.456", ("NVIDIA GeForce, RTX 3080", GpuSample(61.0, 17.0, 1905.46))),
+    ("Tesla T4, [N/A], [Not Supported], 585", ("Tesla T4", GpuSample(None, None, 585.0))),
+    ("Tesla T4, [N/A], [N/A], [N/A]", ("Tesla T4", GpuSample(None, None, None))),
+])
+def test_parse_query_line(line, expected):
+    assert parse_query_line(line) == expected
+
+
+@pytest.mark.parametrize('line', ["", "Tesla T4, 40, 0", "No devices were found"])
+def test_parse_query_line_rejects_short_lines(line):
+    assert parse_query_line(line) is None
+
+
+def test_nvidia_smi_backend():
+    backend = NvidiaSmiBackend(FAKE_NVIDIA_SMI)
+    assert backend.names == ["NVIDIA GeForce, RTX 3080", "Tesla T4"]
+    assert backend.name == "NVIDIA GeForce, RTX 3080"
+    assert backend.sample() == [GpuSample(61.0, 17.0, 1905.5), GpuSample(None, None, 585.0)]
+    backend.close()
+
+
+@pytest.mark.parametrize('mode', ['no-gpu', 'fail'])
+def test_nvidia_smi_backend_unusable(monkeypatch, mode):
+    monkeypatch.setenv('FAKE_NVIDIA_SMI_MODE', mode)
+    with pytest.raises(OSError):
+        NvidiaSmiBackend(FAKE_NVIDIA_SMI)
+    assert open_nvidia_smi(FAKE_NVIDIA_SMI, stream=False) is None
+
+
+def test_open_nvidia_smi_missing_executable(tmp_path):
+    assert open_nvidia_smi(str(tmp_path / 'nvidia-smi'), stream=False) is None
+
+
+def test_open_nvml_missing_library(tmp_path):
+    assert open_nvml(str(tmp_path / 'libnvidia-ml.so.1')) is None
+
+
+def test_open_nvml_library_without_nvml():
+    # Loads, but has none of the NVML functions
+    assert open_nvml('libc.so.6') is None
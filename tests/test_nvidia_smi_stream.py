@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import time
+from pathlib import Path
+
+import pytest
+
+from thermalright_lcd_control.device_controller.metrics import GpuSample
+from thermalright_lcd_control.device_controller.metrics.nvidia_smi import NvidiaSmiStream
+
+FAKE_NVIDIA_SMI = str(Path(__file__).with_name('fake_nvidia_smi.py'))
+INTERVAL = 0.05
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def first_temperature(stream: NvidiaSmiStream) -> float:
+    samples = stream.sample()
+    return samples[0].temperature if samples else 0.0
+
+
+def running(stream: NvidiaSmiStream):
+    """The current child if it is alive"""
+    process = stream._process
+    return process if process is not None and process.poll() is None else None
+
+
+@pytest.fixture
+def stream_factory(monkeypatch):
+    monkeypatch.setattr(NvidiaSmiStream, 'RESTART_DELAY', 0.05)
+    monkeypatch.setattr(NvidiaSmiStream, 'MAX_RESTART_DELAY', 0.2)
+    streams = []
+
+    def create(stream_class=NvidiaSmiStream):
+        stream = stream_class(FAKE_NVIDIA_SMI, interval=INTERVAL)
+        streams.append(stream)
+        return stream
+
+    yield create
+    for stream in streams:
+        stream.close()
+        assert running(stream) is None
+
+
+def test_stream_updates_samples(stream_factory):
+    stream = stream_factory()
+    assert stream.names == ["NVIDIA GeForce, RTX 3080", "Tesla T4"]
+    assert wait_for(lambda: first_temperature(stream) > 62)
+    assert stream.sample()[1] == GpuSample(None, None, 585.0)
+    assert stream.restarts == 0
+
+
+def test_stream_restarts_after_kill(stream_factory):
+    stream = stream_factory()
+    assert wait_for(lambda: running(stream) is not None)
+    first = stream._process
+    first.kill()
+    assert wait_for(lambda: stream.restarts == 1 and running(stream) not in (None, first))
+    # Values start again from the new child
+    assert wait_for(lambda: first_temperature(stream) == 62)
+
+
+def test_stream_restart_backoff(stream_factory, monkeypatch, tmp_path):
+    log = tmp_path / 'starts'
+    monkeypatch.setenv('FAKE_NVIDIA_SMI_MODE', 'crash')
+    monkeypatch.setenv('FAKE_NVIDIA_SMI_LOG', str(log))
+    monkeypatch.setattr(NvidiaSmiStream, 'RESTART_DELAY', 0.2)
+    monkeypatch.setattr(NvidiaSmiStream, 'MAX_RESTART_DELAY', 0.8)
+    stream = stream_factory()
+    assert wait_for(lambda: stream.restarts >= 4, timeout=10.0)
+    stream.close()
+
+    starts = [float(line) for line in log.read_text().split()]
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    for gap, delay in zip(gaps, [0.2, 0.4, 0.8, 0.8]):
+        assert delay <= gap < delay + 0.5
+
+
+def test_stalled_stream_is_killed(stream_factory, monkeypatch):
+    monkeypatch.setenv('FAKE_NVIDIA_SMI_MODE', 'hang')
+    stream = stream_factory()
+    stream.STALL_TIMEOUT = 0.3
+    assert wait_for(lambda: first_temperature(stream) == 62)
+    hung = stream._process
+    monkeypatch.setenv('FAKE_NVIDIA_SMI_MODE', 'ok')
+    # Stale values read as unavailable and get the child killed
+    assert wait_for(lambda: stream.sample() == [])
+    assert wait_for(lambda: hung.poll() is not None)
+    assert wait_for(lambda: stream.restarts == 1 and first_temperature(stream) > 62)
+
+
+class ClosedBeforeStart(NvidiaSmiStream):
+    """Stream closed by another thread between the stop check and the start of its child"""
+
+    def stream_command(self):
+        command = super().stream_command()
+        self.close()
+        return command
+
+
+def test_close_before_child_is_stored(stream_factory):
+    stream = stream_factory(ClosedBeforeStart)
+    stream._thread.join(timeout=2.0)
+    assert not stream._thread.is_alive()
+    assert stream._process is not None
+    assert stream._process.poll() is not None
@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import numpy as np
+import pytest
+import usb.util
+from PIL import Image
+
+from thermalright_lcd_control.device_controller.display.display_device import ChiZhuDisplay
+
+FRAMES = 50
+
+
+class FakeUsbDevice:
+    """Stand-in pyusb device counting the write() calls and bytes of the bulk endpoint"""
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+        self.resets = 0
+
+    def is_kernel_driver_active(self, interface):
+        return False
+
+    def write(self, endpoint, data, timeout=None):
+        # pyusb hands the buffer to libusb, copy it like a submission would
+        size = len(bytes(data))
+        self.writes += 1
+        self.bytes += size
+        return size
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("")
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_claim(monkeypatch):
+    monkeypatch.setattr(usb.util, 'claim_interface', lambda dev, interface: None)
+
+
+def make_display(config_file, monkeypatch, bulk_transfer=True, bulk_transfer_size=None):
+    monkeypatch.setattr(ChiZhuDisplay, 'bulk_transfer', bulk_transfer)
+    monkeypatch.setattr(ChiZhuDisplay, 'bulk_transfer_size', bulk_transfer_size)
+    return ChiZhuDisplay(config_file, dev=FakeUsbDevice())
+
+
+def send_frames(display, frames=FRAMES):
+    """Encode one frame and transmit it repeatedly"""
+    pixels = np.random.default_rng(0).integers(0, 256, (display.height, display.width, 3), dtype=np.uint8)
+    slot = display._new_frame_slot()
+    display._encode_frame(Image.fromarray(pixels, 'RGB'), slot)
+    for _ in range(frames):
+        display._transmit_frame(slot)
+
+
+@pytest.mark.parametrize('bulk_transfer, bulk_transfer_size', [(True, None), (True, 65536), (True, 100),
+                                                               (False, None)])
+def test_writes_per_frame_matches_transfers(config_file, monkeypatch, bulk_transfer, bulk_transfer_size):
+    display = make_display(config_file, monkeypatch, bulk_transfer, bulk_transfer_size)
+    assert display.writes_per_frame() == len(display._new_frame_slot().transfers)
+
+
+def test_bulk_frame_is_one_write(config_file, monkeypatch):
+    display = make_display(config_file, monkeypatch)
+    send_frames(display, frames=1)
+    frame_size = len(display.get_header()) + 480 * 480 * 2
+    assert display.dev.writes == 1
+    # Padded to whole chunks, without report ID bytes
+    assert display.dev.bytes == -(-frame_size // 512) * 512
+
+
+def test_bulk_transfer_size_splits_on_packets(config_file, monkeypatch):
+    display = make_display(config_file, monkeypatch, bulk_transfer_size=65536)
+    send_frames(display, frames=1)
+    assert display.dev.writes == display.writes_per_frame() == 8
+    assert display.dev.bytes == 901 * 512
+
+
+def test_bulk_throughput(config_file, monkeypatch):
+    bulk = make_display(config_file, monkeypatch)
+    send_frames(bulk)
+    report = make_display(config_file, monkeypatch, bulk_transfer=False)
+    send_frames(report)
+
+    assert report.dev.writes == FRAMES * 901
+    assert report.dev.bytes == FRAMES * 901 * 513
+    assert bulk.dev.writes == FRAMES
+    assert bulk.dev.bytes == FRAMES * 901 * 512
@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright © 2025 Rejeb Ben Rejeb
+
+import builtins
+import os
+
+import pytest
+
+from thermalright_lcd_control.device_controller.display.video_cache import VideoCache
+
+WIDTH, HEIGHT = 4, 3
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"not decoded by these tests")
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    return VideoCache(cache_dir)
+
+
+def write_video(cache, video, frames=2):
+    writer = cache.create_writer(video, WIDTH, HEIGHT, 10.0, frames)
+    for index in range(frames):
+        writer.append(bytes([index]) * (WIDTH * HEIGHT * 3))
+    writer.commit().close()
+
+
+def test_open_cached_video(cache, video):
+    assert cache.open(video, WIDTH, HEIGHT) is None
+    write_video(cache, video)
+    mapped = cache.open(video, WIDTH, HEIGHT)
+    assert mapped.frame_count == 2
+    assert mapped.get_frame(3).getpixel((0, 0)) == (1, 1, 1, 255)
+    mapped.close()
+
+
+def test_open_file_of_another_user(cache, video, monkeypatch):
+    write_video(cache, video)
+
+    def utime(path, *args, **kwargs):
+        raise PermissionError(1, "Operation not permitted", str(path))
+
+    monkeypatch.setattr(os, 'utime', utime)
+    mapped = cache.open(video, WIDTH, HEIGHT)
+    assert mapped is not None
+    mapped.close()
+    assert cache._cache_file(video, WIDTH, HEIGHT).exists()
+
+
+def test_open_keeps_unreadable_file(cache, video, monkeypatch):
+    write_video(cache, video)
+    cache_file = cache._cache_file(video, WIDTH, HEIGHT)
+    real_open = builtins.open
+
+    def open_cache_denied(file, *args, **kwargs):
+        if str(file) == str(cache_file):
+            raise PermissionError(13, "Permission denied", str(file))
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', open_cache_denied)
+    assert cache.open(video, WIDTH, HEIGHT) is None
+    assert cache_file.exists()
+
+
+def test_open_discards_invalid_file(cache, video):
+    cache_file = cache._cache_file(video, WIDTH, HEIGHT)
+    cache_file.write_bytes(b"garbage")
+    assert cache.open(video, WIDTH, HEIGHT) is None
+    assert not cache_file.exists()